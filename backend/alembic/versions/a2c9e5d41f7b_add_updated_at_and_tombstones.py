@@ -0,0 +1,48 @@
+"""Add updated_at, enrollment times and tombstones for delta sync
+
+Revision ID: a2c9e5d41f7b
+Revises: f6a18c3d92e7
+Create Date: 2026-10-19 18:05:12.431720
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2c9e5d41f7b'
+down_revision = 'f6a18c3d92e7'
+branch_labels = None
+depends_on = None
+
+TIMESTAMPED = ('user', 'class', 'assignment', 'submission', 'message', 'question', 'answer')
+
+
+def upgrade() -> None:
+    for table in TIMESTAMPED:
+        # Existing rows count as changed now; the application sets it from here on
+        op.add_column(table, sa.Column(
+            'updated_at', sa.DateTime(), nullable=False, server_default=sa.text("timezone('utc', now())")
+        ))
+        op.alter_column(table, 'updated_at', server_default=None)
+        op.create_index(op.f(f'ix_{table}_updated_at'), table, ['updated_at'], unique=False)
+    op.add_column('student_class', sa.Column('enrolled_at', sa.DateTime(), nullable=True))
+    op.create_table('tombstone',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('class_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tombstone_deleted_at'), 'tombstone', ['deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tombstone_deleted_at'), table_name='tombstone')
+    op.drop_table('tombstone')
+    op.drop_column('student_class', 'enrolled_at')
+    for table in TIMESTAMPED:
+        op.drop_index(op.f(f'ix_{table}_updated_at'), table_name=table)
+        op.drop_column(table, 'updated_at')
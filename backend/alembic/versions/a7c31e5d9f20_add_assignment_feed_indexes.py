@@ -0,0 +1,26 @@
+"""Add assignment feed indexes
+
+Revision ID: a7c31e5d9f20
+Revises: 90a3d5604cbf
+Create Date: 2026-10-19 09:12:41.503118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c31e5d9f20'
+down_revision = '90a3d5604cbf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_assignment_class_id_due_date', 'assignment', ['class_id', 'due_date'], unique=False)
+    op.create_index('ix_submission_assignment_id_student_id', 'submission', ['assignment_id', 'student_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_submission_assignment_id_student_id', table_name='submission')
+    op.drop_index('ix_assignment_class_id_due_date', table_name='assignment')
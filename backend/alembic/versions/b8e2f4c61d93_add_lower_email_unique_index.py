@@ -0,0 +1,26 @@
+"""Add a unique index on lower(email)
+
+Revision ID: b8e2f4c61d93
+Revises: a2c9e5d41f7b
+Create Date: 2026-10-19 15:12:40.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e2f4c61d93'
+down_revision = 'a2c9e5d41f7b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Fails if two accounts differ only in the case of their email; merge
+    # them first (SELECT lower(email) FROM "user" GROUP BY 1 HAVING count(*) > 1)
+    op.create_index('ix_user_email_lower', 'user', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_email_lower', table_name='user')
@@ -0,0 +1,45 @@
+"""Add full-text search vectors to questions, answers and messages
+
+Revision ID: c4f82d1be6a9
+Revises: a7c31e5d9f20
+Create Date: 2026-10-19 10:02:55.318042
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f82d1be6a9'
+down_revision = 'a7c31e5d9f20'
+branch_labels = None
+depends_on = None
+
+TABLES = ('question', 'answer', 'message')
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+    # unaccent() is only STABLE; generated columns and indexes need IMMUTABLE
+    op.execute(
+        "CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT "
+        "AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$"
+    )
+    for table in TABLES:
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('simple', f_unaccent(coalesce(content, '')))) STORED"
+        )
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.drop_column(table, 'search_vector')
+    op.execute('DROP FUNCTION IF EXISTS f_unaccent(text)')
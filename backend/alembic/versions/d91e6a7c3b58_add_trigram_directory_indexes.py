@@ -0,0 +1,39 @@
+"""Add trigram indexes for user and class directory search
+
+Revision ID: d91e6a7c3b58
+Revises: c4f82d1be6a9
+Create Date: 2026-10-19 10:41:12.774903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd91e6a7c3b58'
+down_revision = 'c4f82d1be6a9'
+branch_labels = None
+depends_on = None
+
+# (index, table, column); expressions must match app.search._normalized
+INDEXES = (
+    ('ix_user_full_name_trgm', 'user', 'full_name'),
+    ('ix_user_email_trgm', 'user', 'email'),
+    ('ix_class_name_trgm', 'class', 'name'),
+    ('ix_class_class_code_trgm', 'class', 'class_code'),
+)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in INDEXES:
+        op.execute(f'CREATE INDEX {name} ON "{table}" USING gin (f_unaccent(lower({column})) gin_trgm_ops)')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for name, _, _ in INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
@@ -0,0 +1,26 @@
+"""Add message conversation indexes
+
+Revision ID: e3b7f0a2c614
+Revises: d91e6a7c3b58
+Create Date: 2026-10-19 16:05:12.318274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3b7f0a2c614'
+down_revision = 'd91e6a7c3b58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_message_sender_id_receiver_id', 'message', ['sender_id', 'receiver_id'], unique=False)
+    op.create_index('ix_message_receiver_id_sender_id', 'message', ['receiver_id', 'sender_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_message_receiver_id_sender_id', table_name='message')
+    op.drop_index('ix_message_sender_id_receiver_id', table_name='message')
@@ -0,0 +1,38 @@
+"""Add per-class Q&A event log
+
+Revision ID: f6a18c3d92e7
+Revises: e3b7f0a2c614
+Create Date: 2026-10-19 17:22:48.906115
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6a18c3d92e7'
+down_revision = 'e3b7f0a2c614'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('class', sa.Column('qa_seq', sa.Integer(), server_default='0', nullable=False))
+    op.create_table('qaevent',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('class_id', sa.Integer(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=True),
+    sa.Column('answer_id', sa.Integer(), nullable=True),
+    sa.Column('data', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['class_id'], ['class.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('class_id', 'seq', name='uq_qaevent_class_id_seq')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('qaevent')
+    op.drop_column('class', 'qa_seq')
@@ -1,15 +1,36 @@
-from fastapi import APIRouter
-from app.api.api_v1.endpoints import qa, login, auth, users, classes, assignments, upload, chat, submissions, grades, files
+from fastapi import APIRouter, Depends
+from app.api.api_v1.endpoints import qa, login, auth, users, classes, assignments, upload, chat, submissions, grades, files, realtime, sync
+from app.core.ratelimit import RateLimit
+
+# Rate limit policies, declared next to the routers they guard. Each login
+# attempt costs a bcrypt verify, so it is limited per address and per account.
+login_limits = [
+    Depends(RateLimit("login-ip", "20/minute", burst=10, key="ip")),
+    Depends(RateLimit("login-account", "10/minute", burst=5, key="username")),
+]
+register_limit = Depends(RateLimit("register", "10/hour", burst=5, key="ip"))
+upload_limit = RateLimit("upload", "30/minute", burst=10, key="user", methods={"POST"})
 
 api_router = APIRouter()
-api_router.include_router(login.router, tags=["login"])
-api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
-api_router.include_router(users.router, prefix="/users", tags=["users"])
+api_router.include_router(login.router, tags=["login"], dependencies=login_limits)
+api_router.include_router(auth.router, prefix="/auth", tags=["auth"], dependencies=[register_limit])
+api_router.include_router(
+    users.router, prefix="/users", tags=["users"],
+    dependencies=[Depends(upload_limit.only(paths={"/avatar/upload"}))],
+)
 api_router.include_router(classes.router, prefix="/classes", tags=["classes"])
 api_router.include_router(assignments.router, prefix="/assignments", tags=["assignments"])
 api_router.include_router(qa.router, prefix="/qa", tags=["qa"])
-api_router.include_router(upload.router, prefix="/upload", tags=["upload"])
+api_router.include_router(upload.router, prefix="/upload", tags=["upload"], dependencies=[Depends(upload_limit)])
 api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
-api_router.include_router(submissions.router, prefix="/submissions", tags=["submissions"])
+api_router.include_router(
+    submissions.router, prefix="/submissions", tags=["submissions"],
+    dependencies=[Depends(upload_limit.only(paths={"/upload"}))],
+)
 api_router.include_router(grades.router, tags=["grades"])
-api_router.include_router(files.router, prefix="/files", tags=["files"])
+api_router.include_router(
+    files.router, prefix="/files", tags=["files"],
+    dependencies=[Depends(upload_limit.only(paths={"/upload"}))],
+)
+api_router.include_router(realtime.router, tags=["realtime"])
+api_router.include_router(sync.router, tags=["sync"])
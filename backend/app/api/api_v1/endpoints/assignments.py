@@ -1,38 +1,137 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Any, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import and_, case, func
 from sqlalchemy.orm import Session
 
 from app import models, schemas
 from app.api import deps
+from app.api.pagination import keyset_page
+from app.core.cache import response_cache
 from app.db.session import get_db
+from app.schemas.adapters import dump_list_json
 
 router = APIRouter()
 
+def _assignment_scopes(db: Session, class_id: Any) -> List[str]:
+    """Cache scopes of everyone who sees the assignments of this class."""
+    teacher_id = db.query(models.Class.teacher_id).filter(models.Class.id == class_id).scalar()
+    student_ids = db.query(models.student_class.c.student_id).filter(
+        models.student_class.c.class_id == class_id
+    )
+    scopes = ["assignments:all", f"assignments:teacher:{teacher_id}"]
+    scopes.extend(f"assignments:student:{student_id}" for (student_id,) in student_ids)
+    return scopes
+
 @router.get("/", response_model=List[schemas.Assignment])
 def list_assignments(
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
     current_user: models.User = Depends(deps.get_current_active_user),
-):
-    # Students should only see assignments from classes they're enrolled in
-    if current_user.role == models.UserRole.STUDENT:
-        # Get the classes the student is enrolled in
-        enrolled_classes = [cls.id for cls in current_user.classes_enrolled]
-        assignments = db.query(models.Assignment)\
-            .filter(models.Assignment.class_id.in_(enrolled_classes))\
-            .offset(skip).limit(limit).all()
-    elif current_user.role == models.UserRole.TEACHER:
-        # Teachers should see assignments from classes they teach
-        taught_classes = [cls.id for cls in current_user.classes_taught]
-        assignments = db.query(models.Assignment)\
-            .filter(models.Assignment.class_id.in_(taught_classes))\
-            .offset(skip).limit(limit).all()
-    else:
+) -> Any:
+    def load() -> str:
+        query = db.query(models.Assignment)
+        # Students should only see assignments from classes they're enrolled in
+        if current_user.role == models.UserRole.STUDENT:
+            query = query.join(
+                models.student_class,
+                and_(
+                    models.student_class.c.class_id == models.Assignment.class_id,
+                    models.student_class.c.student_id == current_user.id,
+                ),
+            )
+        elif current_user.role == models.UserRole.TEACHER:
+            # Teachers should see assignments from classes they teach
+            query = query.join(models.Class, models.Class.id == models.Assignment.class_id).filter(
+                models.Class.teacher_id == current_user.id
+            )
         # Admins see all assignments
-        assignments = db.query(models.Assignment).offset(skip).limit(limit).all()
-    
-    return assignments
+        assignments = query.order_by(models.Assignment.id).offset(skip).limit(limit).all()
+        return dump_list_json(schemas.Assignment, assignments)
+
+    if current_user.role == models.UserRole.ADMIN:
+        scope = "assignments:all"
+    else:
+        scope = f"assignments:{current_user.role.value}:{current_user.id}"
+    payload = response_cache.get_or_set(scope, {"skip": skip, "limit": limit}, load)
+    return Response(content=payload, media_type="application/json")
+
+# Stand-ins for a missing due date in the sort key, so that assignments
+# without one come after every dated one in either direction
+NO_DUE_DATE = {"due_date": datetime(9999, 12, 31), "-due_date": datetime(1, 1, 1)}
+
+@router.get("/feed", response_model=List[schemas.AssignmentFeedItem])
+def assignment_feed(
+    db: Session = Depends(get_db),
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    sort: Literal["due_date", "-due_date"] = "due_date",
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Assignments of every class the student is enrolled in, with the student's
+    own submission state, in one query. The cursor of the next page, if any,
+    is returned in the X-Next-Cursor header.
+
+    Assignments without a due date are listed last in both sort orders, and
+    are left out whenever ``due_after`` or ``due_before`` is given.
+    """
+    if current_user.role != models.UserRole.STUDENT:
+        raise HTTPException(status_code=403, detail="Không đủ quyền truy cập")
+
+    status = case(
+        (models.Submission.id.is_(None), "not_submitted"),
+        (models.Submission.grade.isnot(None), "graded"),
+        else_="submitted",
+    )
+    due_key = func.coalesce(models.Assignment.due_date, NO_DUE_DATE[sort]).label("due_key")
+    query = (
+        db.query(
+            models.Assignment.id,
+            models.Assignment.title,
+            models.Assignment.description,
+            models.Assignment.due_date,
+            models.Assignment.class_id,
+            models.Submission.id.label("submission_id"),
+            models.Submission.submitted_at,
+            models.Submission.grade,
+            status.label("status"),
+            due_key,
+        )
+        .join(
+            models.student_class,
+            and_(
+                models.student_class.c.class_id == models.Assignment.class_id,
+                models.student_class.c.student_id == current_user.id,
+            ),
+        )
+        .outerjoin(
+            models.Submission,
+            and_(
+                models.Submission.assignment_id == models.Assignment.id,
+                models.Submission.student_id == current_user.id,
+            ),
+        )
+    )
+    if due_after is not None:
+        query = query.filter(models.Assignment.due_date >= due_after)
+    if due_before is not None:
+        query = query.filter(models.Assignment.due_date < due_before)
+
+    rows, next_cursor = keyset_page(
+        query,
+        [due_key, models.Assignment.id],
+        descending=sort.startswith("-"),
+        cursor=cursor,
+        limit=limit,
+    )
+    response = Response(content=dump_list_json(schemas.AssignmentFeedItem, rows), media_type="application/json")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
 
 @router.get("/{assignment_id}", response_model=schemas.Assignment)
 def get_assignment(
@@ -57,6 +156,7 @@ def create_assignment(
     db.add(assignment)
     db.commit()
     db.refresh(assignment)
+    response_cache.invalidate(*_assignment_scopes(db, assignment.class_id))
     return assignment
 
 @router.put("/{assignment_id}", response_model=schemas.Assignment)
@@ -71,6 +171,9 @@ def update_assignment(
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
     
+    # The assignment may move to another class, so collect the old audience first
+    stale_scopes = _assignment_scopes(db, assignment.class_id)
+
     update_data = assignment_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(assignment, field, value)
@@ -78,6 +181,9 @@ def update_assignment(
     db.add(assignment)
     db.commit()
     db.refresh(assignment)
+    if "class_id" in update_data:
+        stale_scopes += _assignment_scopes(db, assignment.class_id)
+    response_cache.invalidate(*stale_scopes)
     return assignment
 
 @router.delete("/{assignment_id}", response_model=schemas.Assignment)
@@ -91,6 +197,8 @@ def delete_assignment(
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
         
+    stale_scopes = _assignment_scopes(db, assignment.class_id)
     db.delete(assignment)
     db.commit()
+    response_cache.invalidate(*stale_scopes)
     return assignment
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app import models, schemas
@@ -14,7 +15,7 @@ def register_user(
     db: Session = Depends(get_db),
 ):
     # Check if user already exists
-    existing_user = db.query(models.User).filter(models.User.email == user_in.email).first()
+    existing_user = db.query(models.User).filter(func.lower(models.User.email) == user_in.email.lower()).first()
     if existing_user:
         raise HTTPException(status_code=400, detail="Email đã được sử dụng")
     
@@ -1,11 +1,17 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, WebSocket, WebSocketDisconnect, status
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_
+from starlette.concurrency import run_in_threadpool
 
-from app import models, schemas
+from app import models, schemas, search, topics
 from app.api import deps
-from app.core.socket_manager import manager
+from app.api.pagination import keyset_page
+from app.core import ws_auth
+from app.core.presence import presence
+from app.core.socket_manager import decode, manager, user_topic
+from app.db.session import in_session
+from app.schemas.adapters import dump_list_json
 
 router = APIRouter()
 
@@ -42,6 +48,60 @@ def get_conversations(
         
     return users
 
+@router.get("/search", response_model=List[schemas.Message])
+def search_messages(
+    q: str = Query(..., min_length=1, max_length=200),
+    user_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Search the current user's messages, or only the conversation with
+    ``user_id``, best match first. The cursor of the next page, if any, is
+    returned in the X-Next-Cursor header.
+    """
+    match, rank = search.match(db, models.Message.__table__, q)
+    rank = rank.label("rank")
+    if user_id is not None:
+        scope = or_(
+            and_(models.Message.sender_id == current_user.id, models.Message.receiver_id == user_id),
+            and_(models.Message.sender_id == user_id, models.Message.receiver_id == current_user.id)
+        )
+    else:
+        scope = or_(models.Message.sender_id == current_user.id, models.Message.receiver_id == current_user.id)
+
+    query = db.query(
+        models.Message.id,
+        models.Message.sender_id,
+        models.Message.receiver_id,
+        models.Message.content,
+        models.Message.timestamp,
+        models.Message.is_read,
+        rank,
+    ).filter(scope, match)
+    rows, next_cursor = keyset_page(query, [rank, models.Message.id], descending=True, cursor=cursor, limit=limit)
+    response = Response(content=dump_list_json(schemas.Message, rows), media_type="application/json")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+@router.get("/presence", response_model=List[schemas.Presence])
+def get_presence(
+    ids: List[int] = Query(..., max_length=500),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Online status and last seen time of several users, e.g. everyone in the
+    conversation list. Later changes arrive as "presence" socket events.
+    """
+    result = []
+    for user_id in dict.fromkeys(ids):
+        online, last_seen = presence.status(user_id)
+        result.append(schemas.Presence(user_id=user_id, online=online, last_seen=last_seen))
+    return result
+
 @router.get("/{user_id}/messages", response_model=List[schemas.Message])
 def get_messages(
     user_id: int,
@@ -63,54 +123,31 @@ def get_messages(
     return messages
 
 @router.websocket("/ws/{user_id}")
-async def websocket_endpoint(
-    websocket: WebSocket,
-    user_id: int,
-    db: Session = Depends(deps.get_db),
-):
+async def websocket_endpoint(websocket: WebSocket, user_id: int) -> None:
     """
-    WebSocket endpoint for real-time chat.
-    user_id: The ID of the current user connecting (in a real app, this should be authenticated via token in WS handshake)
+    WebSocket endpoint for real-time chat, kept for older clients; new ones
+    use the multiplexed /ws endpoint. The token must belong to ``user_id``.
     """
-    # Note: In production, validate user_id matches the authenticated user
-    await manager.connect_user(websocket, user_id)
+    user = await ws_auth.authenticate(websocket)
+    if user is None:
+        return
+    if user.id != user_id:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await manager.connect(websocket, user_topic(user_id), subprotocol=websocket.state.subprotocol, user_id=user_id)
     try:
         while True:
-            data = await websocket.receive_json()
+            try:
+                data = decode(await ws_auth.receive(websocket, user))
+            except ValueError:
+                continue
             # data format: {"receiver_id": int, "content": str}
-            
-            receiver_id = data.get("receiver_id")
-            content = data.get("content")
-            
-            if receiver_id and content:
-                # Save to DB
-                message = models.Message(
-                    sender_id=user_id,
-                    receiver_id=receiver_id,
-                    content=content
-                )
-                db.add(message)
-                db.commit()
-                db.refresh(message)
-                
-                # Send to receiver if connected
-                await manager.send_personal_message(
-                    {
-                        "type": "new_message",
-                        "message": {
-                            "id": message.id,
-                            "sender_id": message.sender_id,
-                            "receiver_id": message.receiver_id,
-                            "content": message.content,
-                            "timestamp": message.timestamp.isoformat(),
-                            "is_read": message.is_read
-                        }
-                    },
-                    receiver_id
-                )
-                
-                # Send confirmation to sender (optional, but good for UI updates if not optimistic)
-                # In this case, we just rely on the sender's UI to update optimistically or via response
-                
+            # A session per message, off the event loop, as in realtime.py
+            event = await run_in_threadpool(in_session, topics.store_message, user_id, data)
+            if event is not None:
+                await manager.publish(user_topic(event["message"]["receiver_id"]), event)
+
     except WebSocketDisconnect:
-        manager.disconnect_user(user_id)
+        pass
+    finally:
+        manager.disconnect(websocket)
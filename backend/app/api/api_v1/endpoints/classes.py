@@ -4,24 +4,93 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app import models, schemas
+from app import models, schemas, search
 from app.api import deps
 from app.db.session import get_db
 import random
 import string
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Any, List, Literal, Optional, Set
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
 
-from app import models, schemas
+from app import models, schemas, search
 from app.api import deps
+from app.api.pagination import keyset_page
+from app.core.cache import response_cache
 from app.db.session import get_db
+from app.schemas.adapters import dump_list_json
 
 router = APIRouter()
 
-def generate_class_code(length=6):
+def generate_class_code(length: int = 6) -> str:
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
 
+# 36^6 codes make a collision rare; give up rather than loop forever
+CODE_ATTEMPTS = 5
+MAX_BULK_CLASSES = 1000
+CLASS_CODE_INDEX = "ix_class_class_code"
+
+def _is_code_collision(error: IntegrityError) -> bool:
+    """Whether ``error`` is the class_code unique index rejecting a duplicate."""
+    diag = getattr(error.orig, "diag", None)
+    if diag is not None:
+        # psycopg names the violated constraint
+        return getattr(diag, "constraint_name", None) == CLASS_CODE_INDEX
+    # SQLite only says so in the message
+    return "UNIQUE constraint failed: class.class_code" in str(error.orig)
+
+def _save_with_codes(db: Session, classes: List[models.Class]) -> None:
+    """
+    Assign fresh codes to ``classes`` and flush them inside a savepoint. The
+    unique index on class_code arbitrates concurrent writers: on a violation
+    only the savepoint is rolled back and new codes are drawn, so the common
+    case costs a single INSERT/UPDATE with no lookup beforehand. Any other
+    integrity error (e.g. an unknown teacher) is a bad request, not retried.
+    """
+    for _ in range(CODE_ATTEMPTS):
+        codes: Set[str] = set()
+        while len(codes) < len(classes):
+            codes.add(generate_class_code())
+        if len(classes) > 1:
+            # One lookup keeps a large batch from failing on a single existing code
+            taken: Set[str] = set(db.scalars(select(models.Class.class_code).where(models.Class.class_code.in_(codes))))
+            codes -= taken
+            while len(codes) < len(classes):
+                code = generate_class_code()
+                if code not in taken:
+                    codes.add(code)
+        for class_obj, code in zip(classes, codes):
+            class_obj.class_code = code
+        try:
+            with db.begin_nested():
+                db.add_all(classes)
+                db.flush()
+            return
+        except IntegrityError as e:
+            if _is_code_collision(e):
+                continue
+            raise HTTPException(status_code=400, detail="Dữ liệu lớp học không hợp lệ")
+    raise HTTPException(status_code=503, detail="Không thể tạo mã lớp học, vui lòng thử lại")
+
+def _class_scopes(db: Session, class_obj: models.Class) -> List[str]:
+    """Cache scopes whose payloads include this class."""
+    student_ids = db.query(models.student_class.c.student_id).filter(
+        models.student_class.c.class_id == class_obj.id
+    )
+    scopes = [
+        f"class:{class_obj.id}",
+        "classes:all",
+        "assignments:all",
+        f"classes:teacher:{class_obj.teacher_id}",
+        f"assignments:teacher:{class_obj.teacher_id}",
+    ]
+    for (student_id,) in student_ids:
+        scopes.append(f"classes:student:{student_id}")
+        scopes.append(f"assignments:student:{student_id}")
+    return scopes
+
 @router.post("/", response_model=schemas.ClassSchema)
 def create_class(
     *,
@@ -32,22 +101,46 @@ def create_class(
     if current_user.role != models.UserRole.TEACHER and current_user.role != models.UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Không đủ quyền truy cập")
     
-    # Generate unique class code
-    while True:
-        code = generate_class_code()
-        if not db.query(models.Class).filter(models.Class.class_code == code).first():
-            break
-            
     class_obj = models.Class(
-        **class_in.dict(),
+        **class_in.model_dump(exclude={"teacher_id", "class_code"}),
         teacher_id=current_user.id,
-        class_code=code
     )
-    db.add(class_obj)
+    _save_with_codes(db, [class_obj])
     db.commit()
     db.refresh(class_obj)
+    response_cache.invalidate("classes:all", f"classes:teacher:{class_obj.teacher_id}")
     return class_obj
 
+@router.post("/bulk", response_model=List[schemas.ClassSchema])
+def create_classes_bulk(
+    *,
+    db: Session = Depends(get_db),
+    classes_in: List[schemas.ClassCreate],
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Create many classes at once (admin only), each with its own code.
+    """
+    if current_user.role != models.UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Không đủ quyền truy cập")
+    if not classes_in or len(classes_in) > MAX_BULK_CLASSES:
+        raise HTTPException(status_code=400, detail=f"Số lớp học phải từ 1 đến {MAX_BULK_CLASSES}")
+
+    teacher_ids = {c.teacher_id for c in classes_in if c.teacher_id is not None}
+    found: Set[int] = set(db.scalars(select(models.User.id).where(
+        models.User.id.in_(teacher_ids), models.User.role == models.UserRole.TEACHER
+    )))
+    if found != teacher_ids:
+        raise HTTPException(status_code=400, detail="Giáo viên không hợp lệ")
+
+    classes = [models.Class(**class_in.model_dump(exclude={"class_code"})) for class_in in classes_in]
+    _save_with_codes(db, classes)
+    db.commit()
+    response_cache.invalidate("classes:all", *(f"classes:teacher:{teacher_id}" for teacher_id in teacher_ids))
+    return db.query(models.Class).options(joinedload(models.Class.teacher)).filter(
+        models.Class.id.in_([c.id for c in classes])
+    ).order_by(models.Class.id).all()
+
 @router.post("/join", response_model=schemas.ClassSchema)
 def join_class(
     *,
@@ -66,6 +159,7 @@ def join_class(
         
     current_user.classes_enrolled.append(class_obj)
     db.commit()
+    response_cache.invalidate(f"classes:student:{current_user.id}", f"assignments:student:{current_user.id}")
     return class_obj
 
 @router.post("/{class_id}/regenerate-code", response_model=schemas.ClassSchema)
@@ -83,49 +177,97 @@ def regenerate_class_code(
     if current_user.role != models.UserRole.ADMIN and class_obj.teacher_id != current_user.id:
         raise HTTPException(status_code=403, detail="Không đủ quyền truy cập")
         
-    # Generate new code
-    while True:
-        code = generate_class_code()
-        if not db.query(models.Class).filter(models.Class.class_code == code).first():
-            break
-            
-    class_obj.class_code = code
+    _save_with_codes(db, [class_obj])
     db.commit()
     db.refresh(class_obj)
+    response_cache.invalidate(*_class_scopes(db, class_obj))
     return class_obj
 
+# Sort keys accepted by list_classes; the trailing id keeps the order total
+CLASS_SORTS = {
+    "id": [models.Class.id],
+    "name": [models.Class.name, models.Class.id],
+}
+
 @router.get("/", response_model=List[schemas.ClassSchema])
 def list_classes(
     db: Session = Depends(get_db),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    sort: Literal["id", "-id", "name", "-name"] = "id",
+    cursor: Optional[str] = None,
     current_user: models.User = Depends(deps.get_current_active_user),
-):
-    from sqlalchemy.orm import joinedload
-    
-    # Teachers see their own classes, students see classes they're enrolled in
+) -> Any:
+    """
+    List classes visible to the current user. The cursor of the next page,
+    if any, is returned in the X-Next-Cursor header.
+    """
+    def load() -> List[Any]:
+        query = db.query(models.Class).options(joinedload(models.Class.teacher))
+        # Teachers see their own classes, students see classes they're enrolled in
+        if current_user.role == models.UserRole.TEACHER:
+            query = query.filter(models.Class.teacher_id == current_user.id)
+        elif current_user.role == models.UserRole.STUDENT:
+            # Seek through the (student_id, class_id) key instead of loading every enrollment
+            query = query.join(models.student_class, models.student_class.c.class_id == models.Class.id).filter(
+                models.student_class.c.student_id == current_user.id
+            )
+        classes, next_cursor = keyset_page(
+            query,
+            CLASS_SORTS[sort.lstrip("-")],
+            descending=sort.startswith("-"),
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
+        )
+        return [dump_list_json(schemas.ClassSchema, classes), next_cursor]
+
+    if current_user.role == models.UserRole.ADMIN:
+        scope = "classes:all"
+    else:
+        scope = f"classes:{current_user.role.value}:{current_user.id}"
+    payload, next_cursor = response_cache.get_or_set(
+        scope, {"skip": skip, "limit": limit, "sort": sort, "cursor": cursor}, load
+    )
+    response = Response(content=payload, media_type="application/json")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+@router.get("/search", response_model=List[schemas.ClassSchema])
+def search_classes(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Typeahead over class names and codes among the classes the user can see.
+    """
+    condition, score = search.fuzzy(db, [models.Class.name, models.Class.class_code], q)
+    query = db.query(models.Class).options(joinedload(models.Class.teacher)).filter(condition)
     if current_user.role == models.UserRole.TEACHER:
-        classes = db.query(models.Class).options(joinedload(models.Class.teacher)).filter(models.Class.teacher_id == current_user.id).offset(skip).limit(limit).all()
+        query = query.filter(models.Class.teacher_id == current_user.id)
     elif current_user.role == models.UserRole.STUDENT:
-        # efficient pagination for many-to-many might require a direct query on the association table
-        # but for now, accessing the relationship is simpler and likely sufficient for reasonable class counts
-        classes = current_user.classes_enrolled[skip : skip + limit]
-    else:
-        # Admin sees all
-        classes = db.query(models.Class).options(joinedload(models.Class.teacher)).offset(skip).limit(limit).all()
-        
-    return classes
+        query = query.join(models.student_class, models.student_class.c.class_id == models.Class.id).filter(
+            models.student_class.c.student_id == current_user.id
+        )
+    return query.order_by(score.desc(), models.Class.name, models.Class.id).limit(limit).all()
 
 @router.get("/{class_id}", response_model=schemas.ClassSchema)
 def get_class(
     class_id: int,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(deps.get_current_active_user),
-):
-    class_obj = db.query(models.Class).filter(models.Class.id == class_id).first()
-    if not class_obj:
-        raise HTTPException(status_code=404, detail="Không tìm thấy lớp học")
-    return class_obj
+) -> Any:
+    def load() -> str:
+        class_obj = db.query(models.Class).filter(models.Class.id == class_id).first()
+        if not class_obj:
+            raise HTTPException(status_code=404, detail="Không tìm thấy lớp học")
+        return schemas.ClassSchema.model_validate(class_obj).model_dump_json()
+
+    payload = response_cache.get_or_set(f"class:{class_id}", {}, load)
+    return Response(content=payload, media_type="application/json")
 
 @router.put("/{class_id}", response_model=schemas.ClassSchema)
 def update_class(
@@ -143,6 +285,9 @@ def update_class(
     if current_user.role != models.UserRole.ADMIN and class_obj.teacher_id != current_user.id:
         raise HTTPException(status_code=403, detail="Không đủ quyền truy cập")
         
+    # Scopes of the previous teacher too, in case the class is reassigned
+    stale_scopes = _class_scopes(db, class_obj)
+
     # Update fields
     if class_in.name is not None:
         class_obj.name = class_in.name
@@ -153,6 +298,7 @@ def update_class(
         
     db.commit()
     db.refresh(class_obj)
+    response_cache.invalidate(*stale_scopes, f"classes:teacher:{class_obj.teacher_id}", f"assignments:teacher:{class_obj.teacher_id}")
     return class_obj
 
 @router.delete("/{class_id}")
@@ -170,6 +316,8 @@ def delete_class(
     if not class_obj:
         raise HTTPException(status_code=404, detail="Không tìm thấy lớp học")
         
+    stale_scopes = _class_scopes(db, class_obj)
     db.delete(class_obj)
     db.commit()
+    response_cache.invalidate(*stale_scopes)
     return {"message": "Đã xóa lớp học thành công"}
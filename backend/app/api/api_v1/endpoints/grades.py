@@ -1,9 +1,11 @@
-from typing import Any, List
+from typing import Any, List, Literal
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app import models, schemas
 from app.api import deps
+from app.gradebook import csv_chunks, gradebook_rows, load_columns, xlsx_chunks
 
 router = APIRouter()
 
@@ -73,3 +75,34 @@ def read_my_progress(
         progress_data.append({"subject": cls.name, "percentage": percentage})
 
     return progress_data
+
+@router.get("/grades/classes/{class_id}/export")
+def export_gradebook(
+    class_id: int,
+    format: Literal["csv", "xlsx"] = "csv",
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Stream the students x assignments grade matrix of a class (Teacher only).
+    """
+    class_obj = db.query(models.Class).filter(models.Class.id == class_id).first()
+    if not class_obj:
+        raise HTTPException(status_code=404, detail="Class not found")
+    if current_user.role != "admin" and class_obj.teacher_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    columns = load_columns(db, class_id)
+    header = ["Học sinh", "Email", *(title for _, title in columns), "Trung bình"]
+    rows = gradebook_rows(class_id, [assignment_id for assignment_id, _ in columns])
+    if format == "xlsx":
+        body = xlsx_chunks(header, rows, sheet_name=str(class_obj.name or "Gradebook"))
+        media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    else:
+        body = csv_chunks(header, rows)
+        media_type = "text/csv; charset=utf-8"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="gradebook-{class_id}.{format}"'},
+    )
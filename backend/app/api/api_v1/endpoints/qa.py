@@ -1,11 +1,22 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
-from sqlalchemy.orm import Session, joinedload
+import asyncio
+import time
+from typing import List, Any, AsyncIterator, Dict, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.sql.elements import Label
+from starlette.concurrency import run_in_threadpool
 
-from app import models, schemas
+from app import models, qa_events, schemas, search, topics
 from app.api import deps
-from app.db.session import get_db
-from app.core.socket_manager import manager
+from app.api.pagination import keyset_page
+from app.core import ws_auth
+from app.core.config import settings
+from app.core.event_stream import KEEPALIVE, RESET, event_streams, format_event, log_position
+from app.db.session import get_db, in_session
+from app.schemas.adapters import dump_list_json
+from app.core.socket_manager import class_topic, manager
 
 
 router = APIRouter()
@@ -13,30 +24,112 @@ router = APIRouter()
 @router.get("/{class_id}", response_model=List[schemas.Question])
 def read_questions(
     class_id: int,
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
-):
+) -> List[models.Question]:
+    """
+    The class's questions. X-Event-Seq is the class's event sequence as of
+    just before they were read: sync from there with /{class_id}/changes.
+    """
+    seq = db.query(models.Class.qa_seq).filter(models.Class.id == class_id).scalar()
+    if seq is not None:
+        response.headers["X-Event-Seq"] = str(seq)
     questions = db.query(models.Question).options(joinedload(models.Question.student)).filter(models.Question.class_id == class_id).offset(skip).limit(limit).all()
     return questions
 
 
+def _ensure_class_member(db: Session, class_id: int, user: models.User) -> None:
+    if user.role == models.UserRole.ADMIN:
+        return
+    class_obj = db.query(models.Class).filter(models.Class.id == class_id).first()
+    if not class_obj:
+        raise HTTPException(status_code=404, detail="Không tìm thấy lớp học")
+    if class_obj.teacher_id == user.id:
+        return
+    enrolled = db.query(models.student_class).filter(
+        models.student_class.c.class_id == class_id, models.student_class.c.student_id == user.id
+    ).first()
+    if not enrolled:
+        raise HTTPException(status_code=403, detail="Không đủ quyền truy cập")
+
+@router.get("/{class_id}/search", response_model=List[schemas.Question])
+def search_questions(
+    class_id: int,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Response:
+    """
+    Questions of a class matching ``q`` in their text or in an answer, best
+    match first. The cursor of the next page, if any, is returned in the
+    X-Next-Cursor header.
+    """
+    _ensure_class_member(db, class_id, current_user)
+
+    question_match, question_rank = search.match(db, models.Question.__table__, q)
+    answer_match, answer_rank = search.match(db, models.Answer.__table__, q)
+    best_answer = select(func.max(answer_rank)).where(
+        models.Answer.question_id == models.Question.id, answer_match
+    ).scalar_subquery()
+    rank = (case((question_match, question_rank), else_=0.0) + func.coalesce(best_answer, 0.0)).label("rank")
+    question_id: Label[int] = models.Question.id.label("question_id")
+
+    query = db.query(models.Question, rank, question_id).options(
+        joinedload(models.Question.student),
+        selectinload(models.Question.answers).joinedload(models.Answer.teacher),
+    ).filter(
+        models.Question.class_id == class_id,
+        or_(question_match, best_answer.isnot(None)),
+    )
+    rows, next_cursor = keyset_page(query, [rank, question_id], descending=True, cursor=cursor, limit=limit)
+    response = Response(
+        content=dump_list_json(schemas.Question, [row.Question for row in rows]), media_type="application/json"
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+def _next_seq(db: Session, class_id: Any) -> int:
+    seq = qa_events.next_seq(db, class_id)
+    if seq is None:
+        raise HTTPException(status_code=404, detail="Không tìm thấy lớp học")
+    return seq
+
+async def _publish(
+    class_id: Any, seq: int, message: Dict[str, Any], compact: Optional[Dict[str, Any]] = None
+) -> None:
+    await manager.publish(
+        class_topic(class_id),
+        {"seq": seq, **message},
+        compact={"seq": seq, **compact} if compact is not None else None,
+    )
+
+
 @router.post("/", response_model=schemas.Question)
 async def create_question(
     question_in: schemas.QuestionCreate,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(deps.get_current_active_user)
-):
+) -> models.Question:
     # if current_user.role != models.UserRole.STUDENT:
     #      raise HTTPException(status_code=403, detail="Only students can ask questions")
 
-
+    seq = _next_seq(db, question_in.class_id)
     question = models.Question(
         content=question_in.content,
         class_id=question_in.class_id,
         student_id=current_user.id
     )
     db.add(question)
+    db.flush()
+    qa_events.record(
+        db, question.class_id, seq, qa_events.QUESTION_CREATED,
+        question_id=question.id, data=qa_events.snapshot(question),
+    )
     db.commit()
     db.refresh(question)
     
@@ -44,54 +137,284 @@ async def create_question(
     # We need to serialize the question with the student info if possible, or just basic info
     # For simplicity, we re-query or just rely on what we have. 
     # Ideally, we should eagerly load the student relationship if the schema requires it.
-    question_dict = schemas.Question.from_orm(question).dict()
-    # Convert datetime to ISO string for JSON serialization
-    if 'timestamp' in question_dict and question_dict['timestamp']:
-        question_dict['timestamp'] = question_dict['timestamp'].isoformat()
-    await manager.broadcast({"type": "new_question", "data": question_dict}, question_in.class_id)
+    question_dict = schemas.Question.model_validate(question).model_dump()
+    await _publish(
+        question.class_id, seq,
+        {"type": "new_question", "data": question_dict},
+        compact={"type": "new_question", "data": schemas.QuestionSummary.model_validate(question).model_dump()},
+    )
 
     
     return question
 
+@router.put("/questions/{question_id}", response_model=schemas.Question)
+async def update_question(
+    question_id: int,
+    question_in: schemas.QuestionUpdate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_active_user)
+) -> models.Question:
+    question = db.query(models.Question).filter(models.Question.id == question_id).first()
+    if not question:
+        raise HTTPException(status_code=404, detail="Không tìm thấy câu hỏi")
+    if question.student_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Không đủ quyền truy cập")
+
+    seq = _next_seq(db, question.class_id)
+    question.content = question_in.content
+    db.flush()
+    qa_events.record(
+        db, question.class_id, seq, qa_events.QUESTION_UPDATED,
+        question_id=question.id, data=qa_events.snapshot(question),
+    )
+    db.commit()
+    db.refresh(question)
+
+    await _publish(
+        question.class_id, seq,
+        {"type": qa_events.QUESTION_UPDATED, "data": schemas.Question.model_validate(question).model_dump()},
+        compact={"type": qa_events.QUESTION_UPDATED, "data": schemas.QuestionSummary.model_validate(question).model_dump()},
+    )
+    return question
+
+@router.delete("/questions/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_question(
+    question_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_active_user)
+) -> Response:
+    question = db.query(models.Question).options(joinedload(models.Question.class_)).filter(
+        models.Question.id == question_id
+    ).first()
+    if not question:
+        raise HTTPException(status_code=404, detail="Không tìm thấy câu hỏi")
+    if not (
+        question.student_id == current_user.id
+        or current_user.role == models.UserRole.ADMIN
+        or (question.class_ is not None and question.class_.teacher_id == current_user.id)
+    ):
+        raise HTTPException(status_code=403, detail="Không đủ quyền truy cập")
+
+    class_id = question.class_id
+    seq = _next_seq(db, class_id)
+    # Its answers go with it; clients drop them on question_deleted
+    db.delete(question)
+    qa_events.record(db, class_id, seq, qa_events.QUESTION_DELETED, question_id=question_id)
+    db.commit()
+
+    await _publish(class_id, seq, {"type": qa_events.QUESTION_DELETED, "question_id": question_id})
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
 @router.post("/answer", response_model=schemas.Answer)
 async def create_answer(
     answer_in: schemas.AnswerCreate,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(deps.get_current_active_user)
-):
+) -> models.Answer:
     if current_user.role != models.UserRole.TEACHER:
          raise HTTPException(status_code=403, detail="Only teachers can answer questions")
 
+    # The event goes in the question's class log
+    question = db.query(models.Question).filter(models.Question.id == answer_in.question_id).first()
+    if not question:
+        raise HTTPException(status_code=404, detail="Không tìm thấy câu hỏi")
+    seq = _next_seq(db, question.class_id)
+
     answer = models.Answer(
         content=answer_in.content,
         question_id=answer_in.question_id,
         teacher_id=current_user.id
     )
     db.add(answer)
+    db.flush()
+    qa_events.record(
+        db, question.class_id, seq, qa_events.ANSWER_CREATED,
+        question_id=question.id, answer_id=answer.id, data=qa_events.snapshot(answer=answer),
+    )
     db.commit()
     db.refresh(answer)
     
-    # Get class_id from question to broadcast
-    question = db.query(models.Question).filter(models.Question.id == answer_in.question_id).first()
-    if question:
-        answer_dict = schemas.Answer.from_orm(answer).dict()
-        # Convert datetime to ISO string for JSON serialization
-        if 'timestamp' in answer_dict and answer_dict['timestamp']:
-            answer_dict['timestamp'] = answer_dict['timestamp'].isoformat()
-        await manager.broadcast({"type": "new_answer", "data": answer_dict}, question.class_id)
+    answer_dict = schemas.Answer.model_validate(answer).model_dump()
+    await _publish(
+        question.class_id, seq,
+        {"type": "new_answer", "data": answer_dict},
+        compact={"type": "new_answer", "data": schemas.AnswerSummary.model_validate(answer).model_dump()},
+    )
 
 
     return answer
 
+def _get_answer(db: Session, answer_id: int) -> models.Answer:
+    answer = db.query(models.Answer).options(joinedload(models.Answer.question)).filter(
+        models.Answer.id == answer_id
+    ).first()
+    if not answer or answer.question is None:
+        raise HTTPException(status_code=404, detail="Không tìm thấy câu trả lời")
+    return answer
+
+@router.put("/answers/{answer_id}", response_model=schemas.Answer)
+async def update_answer(
+    answer_id: int,
+    answer_in: schemas.AnswerUpdate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_active_user)
+) -> models.Answer:
+    answer = _get_answer(db, answer_id)
+    if answer.teacher_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Không đủ quyền truy cập")
+
+    class_id = answer.question.class_id
+    seq = _next_seq(db, class_id)
+    answer.content = answer_in.content
+    db.flush()
+    qa_events.record(
+        db, class_id, seq, qa_events.ANSWER_UPDATED,
+        question_id=answer.question_id, answer_id=answer.id, data=qa_events.snapshot(answer=answer),
+    )
+    db.commit()
+    db.refresh(answer)
+
+    await _publish(
+        class_id, seq,
+        {"type": qa_events.ANSWER_UPDATED, "data": schemas.Answer.model_validate(answer).model_dump()},
+        compact={"type": qa_events.ANSWER_UPDATED, "data": schemas.AnswerSummary.model_validate(answer).model_dump()},
+    )
+    return answer
+
+@router.delete("/answers/{answer_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_answer(
+    answer_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_active_user)
+) -> Response:
+    answer = _get_answer(db, answer_id)
+    if answer.teacher_id != current_user.id and current_user.role != models.UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Không đủ quyền truy cập")
+
+    class_id, question_id = answer.question.class_id, answer.question_id
+    seq = _next_seq(db, class_id)
+    db.delete(answer)
+    qa_events.record(db, class_id, seq, qa_events.ANSWER_DELETED, question_id=question_id, answer_id=answer_id)
+    db.commit()
+
+    await _publish(
+        class_id, seq, {"type": qa_events.ANSWER_DELETED, "question_id": question_id, "answer_id": answer_id}
+    )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/{class_id}/changes", response_model=schemas.QAChanges)
+def read_changes(
+    class_id: int,
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Dict[str, Any]:
+    """
+    The class's Q&A events after sequence ``since``, oldest first: a client
+    holding a copy applies them and asks again from ``last_seq``, and only
+    reloads everything (with X-Event-Seq from /{class_id}) when it has none.
+    Live socket and SSE events carry the same ``seq``.
+    """
+    _ensure_class_member(db, class_id, current_user)
+    events = qa_events.since(db, class_id, since, limit + 1)
+    has_more = len(events) > limit
+    events = events[:limit]
+    return {
+        "events": events,
+        "last_seq": events[-1].seq if events else since,
+        "has_more": has_more,
+    }
+
+
+@router.get("/{class_id}/events")
+async def stream_events(
+    class_id: int,
+    request: Request,
+    token: Optional[str] = None,
+    since: Optional[int] = Query(None, ge=0),
+    last_event_id: Optional[str] = Header(None),
+) -> StreamingResponse:
+    """
+    Server-Sent Events fallback for networks that block WebSockets: the
+    class socket's events, in compact form. Event ids are the class's Q&A
+    log sequence, so a stream resumes from the log with Last-Event-ID, or
+    from ``?since=`` (e.g. X-Event-Seq of /{class_id}) on the first connect.
+    A "reset" event means the missed events can't be replayed (too many):
+    reload the questions, then keep applying the stream. EventSource cannot
+    set headers, so the access token may be passed as ``?token=``.
+    """
+    scheme, _, bearer = request.headers.get("authorization", "").partition(" ")
+    user = await ws_auth.verify(token or (bearer if scheme.lower() == "bearer" else None))
+    if user is None:
+        raise HTTPException(status_code=403, detail="Không thể xác thực thông tin đăng nhập")
+    topic = class_topic(class_id)
+    if not await run_in_threadpool(in_session, topics.can_subscribe, user.id, user.role, topic):
+        raise HTTPException(status_code=403, detail="Không đủ quyền truy cập")
+
+    resume_from = log_position(last_event_id) if last_event_id else since
+
+    async def events() -> AsyncIterator[bytes]:
+        queue, backlog = event_streams.subscribe(topic, last_event_id)
+        # Last seq sent from the log; queued events up to it are duplicates
+        replayed: Optional[int] = None
+        try:
+            yield b"retry: 3000\n\n"
+            if resume_from is not None:
+                # Read after subscribing, so no event falls in between
+                missed = await run_in_threadpool(
+                    in_session, qa_events.replay, class_id, resume_from, settings.SSE_HISTORY_SIZE + 1
+                )
+                if len(missed) > settings.SSE_HISTORY_SIZE:
+                    backlog = [RESET]
+                else:
+                    backlog = [format_event(str(m["seq"]), {"topic": topic, **m}) for m in missed]
+                    replayed = missed[-1]["seq"] if missed else resume_from
+            for frame in backlog:
+                yield frame
+            while True:
+                remaining = user.expires_at - time.time()
+                if remaining <= 0:
+                    return
+                try:
+                    item = await asyncio.wait_for(
+                        queue.get(), timeout=min(settings.SSE_KEEPALIVE_SECONDS, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle stream
+                    yield KEEPALIVE
+                    continue
+                if item is None:
+                    return
+                seq, frame = item
+                if seq is not None and replayed is not None and seq <= replayed:
+                    continue
+                yield frame
+        finally:
+            event_streams.unsubscribe(topic, queue)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 
 @router.websocket("/ws/{class_id}")
-async def websocket_endpoint(websocket: WebSocket, class_id: int):
-    await manager.connect(websocket, class_id)
+async def websocket_endpoint(websocket: WebSocket, class_id: int) -> None:
+    # Single-class socket kept for older clients; new ones subscribe to
+    # class_topic(class_id) on the multiplexed /ws endpoint
+    user = await ws_auth.authenticate(websocket)
+    if user is None:
+        return
+    topic = class_topic(class_id)
+    if not await run_in_threadpool(in_session, topics.can_subscribe, user.id, user.role, topic):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await manager.connect(websocket, topic, subprotocol=websocket.state.subprotocol)
     try:
         while True:
-            data = await websocket.receive_text()
-            # Handle incoming messages if needed
-            # await manager.broadcast(f"Message text was: {data}", class_id)
-            pass
+            await ws_auth.receive(websocket, user)
     except WebSocketDisconnect:
-        manager.disconnect(websocket, class_id)
+        pass
+    finally:
+        manager.disconnect(websocket)
@@ -0,0 +1,91 @@
+"""
+One WebSocket per client carrying every real-time topic it follows.
+
+Connect to ``/ws`` with an access token (see app.core.ws_auth); the
+user's own topic ("user:<id>": direct messages, notifications) is
+subscribed on connect. The client then sends JSON actions:
+
+    {"action": "subscribe", "topic": "class:12:qa"}
+    {"action": "unsubscribe", "topic": "class:12:qa"}
+    {"action": "send_message", "receiver_id": 7, "content": "..."}
+    {"action": "auth", "token": "<newer access token>"}
+    {"action": "ping"}
+
+Events arrive tagged with their topic, e.g. {"topic": "class:12:qa",
+"type": "new_question", "data": {...}}; actions are answered with
+"subscribed", "unsubscribed", "authenticated", "pong" or "error" frames.
+
+Events are compact: users are referenced by id (``student_id``,
+``teacher_id``), for the client to resolve from its cache or through
+``GET /users/batch``. Offering the "msgpack" subprotocol alongside the
+token switches frames both ways to binary MessagePack.
+The socket is closed (1008) when its token expires without being renewed
+through "auth".
+"""
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
+
+from app import topics
+from app.core import ws_auth
+from app.core.socket_manager import decode, manager, user_topic
+from app.db.session import in_session
+
+router = APIRouter()
+
+MAX_SUBSCRIPTIONS = 100
+
+
+@router.websocket("/ws")
+async def websocket_endpoint(websocket: WebSocket) -> None:
+    # Besides the handshake, the database is only used to authorize a
+    # subscription and store a message; events are fanned out from memory
+    user = await ws_auth.authenticate(websocket)
+    if user is None:
+        return
+
+    await manager.connect(
+        websocket, user_topic(user.id), subprotocol=websocket.state.subprotocol, compact=True, user_id=user.id
+    )
+    try:
+        while True:
+            try:
+                data = decode(await ws_auth.receive(websocket, user))
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                await manager.send(websocket, {"type": "error", "detail": "Yêu cầu không hợp lệ"})
+                continue
+
+            action, topic = data.get("action"), data.get("topic")
+            if action == "ping":
+                await manager.send(websocket, {"type": "pong"})
+            elif action == "subscribe" and isinstance(topic, str):
+                if len(manager.subscriptions.get(websocket, ())) >= MAX_SUBSCRIPTIONS:
+                    await manager.send(websocket, {"type": "error", "topic": topic, "detail": "Quá nhiều chủ đề"})
+                elif await run_in_threadpool(in_session, topics.can_subscribe, user.id, user.role, topic):
+                    manager.subscribe(websocket, topic)
+                    await manager.send(websocket, {"type": "subscribed", "topic": topic})
+                else:
+                    await manager.send(websocket, {"type": "error", "topic": topic, "detail": "Không đủ quyền truy cập"})
+            elif action == "unsubscribe" and isinstance(topic, str):
+                manager.unsubscribe(websocket, topic)
+                await manager.send(websocket, {"type": "unsubscribed", "topic": topic})
+            elif action == "auth":
+                if await ws_auth.refresh(user, data.get("token")):
+                    await manager.send(websocket, {"type": "authenticated", "expires_at": user.expires_at})
+                else:
+                    await manager.send(websocket, {"type": "error", "detail": "Không thể xác thực thông tin đăng nhập"})
+            elif action == "send_message":
+                event = await run_in_threadpool(in_session, topics.store_message, user.id, data)
+                if event is None:
+                    await manager.send(websocket, {"type": "error", "detail": "Tin nhắn không hợp lệ"})
+                    continue
+                await manager.publish(user_topic(event["message"]["receiver_id"]), event)
+                # The sender's other tabs; this one already shows the message
+                await manager.publish(user_topic(user.id), event, exclude=websocket)
+            else:
+                await manager.send(websocket, {"type": "error", "detail": "Yêu cầu không hợp lệ"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        manager.disconnect(websocket)
@@ -1,12 +1,18 @@
 from typing import List, Any
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import case
+from sqlalchemy.orm import Session, joinedload
 from app import models, schemas
 from app.api import deps
+from app.archive import archive_entries, archive_key, cache_archive, load_submissions
+from app.core.config import settings
+from app.core.streaming import zip_chunks
 from app.db.session import get_db
 import shutil
 import os
 from datetime import datetime
+from pathlib import Path
 
 router = APIRouter()
 
@@ -44,7 +50,7 @@ def create_submission(
         return existing_submission
 
     submission = models.Submission(
-        **submission_in.dict(),
+        **submission_in.model_dump(),
         student_id=current_user.id
     )
     db.add(submission)
@@ -86,6 +92,36 @@ def read_assignment_submissions(
     ).offset(skip).limit(limit).all()
     return submissions
 
+@router.get("/assignment/{assignment_id}/archive")
+def download_assignment_submissions(
+    assignment_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Download every submission of an assignment as a ZIP, one folder per student (Teacher only).
+    """
+    assignment = db.query(models.Assignment).filter(models.Assignment.id == assignment_id).first()
+    if not assignment:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+    if current_user.role != "admin" and (assignment.class_ is None or assignment.class_.teacher_id != current_user.id):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    submissions = load_submissions(db, assignment_id)
+    filename = f"submissions-{assignment_id}.zip"
+    key = archive_key(assignment_id, submissions)
+    headers = {"ETag": f'"{key}"'}
+    cache_dir = Path(settings.SUBMISSION_ARCHIVE_CACHE_DIR) if settings.SUBMISSION_ARCHIVE_CACHE_DIR else None
+    if cache_dir and (cache_dir / f"{key}.zip").is_file():
+        # Served with sendfile, no Python-side copying
+        return FileResponse(cache_dir / f"{key}.zip", media_type="application/zip", filename=filename, headers=headers)
+
+    body = zip_chunks(archive_entries(submissions))
+    if cache_dir:
+        body = cache_archive(body, cache_dir, key)
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(body, media_type="application/zip", headers=headers)
+
 @router.put("/{submission_id}", response_model=schemas.Submission)
 def grade_submission(
     *,
@@ -104,7 +140,7 @@ def grade_submission(
     if not submission:
         raise HTTPException(status_code=404, detail="Submission not found")
         
-    update_data = submission_in.dict(exclude_unset=True)
+    update_data = submission_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(submission, field, value)
         
@@ -113,6 +149,60 @@ def grade_submission(
     db.refresh(submission)
     return submission
 
+MAX_BULK_GRADES = 1000
+
+@router.put("/assignment/{assignment_id}/grades", response_model=List[schemas.Submission])
+def grade_submissions_bulk(
+    *,
+    db: Session = Depends(get_db),
+    assignment_id: int,
+    grades_in: List[schemas.GradeEntry],
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Grade many submissions of one assignment in a single transaction (Teacher only).
+    """
+    if current_user.role != "teacher" and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if not grades_in or len(grades_in) > MAX_BULK_GRADES:
+        raise HTTPException(status_code=400, detail=f"Between 1 and {MAX_BULK_GRADES} grades are allowed")
+
+    # Authorization is decided once for the whole batch
+    teacher_id = db.query(models.Class.teacher_id).join(
+        models.Assignment, models.Assignment.class_id == models.Class.id
+    ).filter(models.Assignment.id == assignment_id).first()
+    if teacher_id is None:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+    if current_user.role != "admin" and teacher_id[0] != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    ids = [entry.submission_id for entry in grades_in]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="Duplicate submission ids")
+    found = {
+        submission_id for (submission_id,) in db.query(models.Submission.id).filter(
+            models.Submission.assignment_id == assignment_id, models.Submission.id.in_(ids)
+        )
+    }
+    missing = [submission_id for submission_id in ids if submission_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Submissions not found: {missing}")
+
+    # One UPDATE ... SET col = CASE id WHEN ... END for the whole batch
+    values = {}
+    for field in ("grade", "feedback"):
+        per_id = {entry.submission_id: getattr(entry, field) for entry in grades_in if field in entry.model_fields_set}
+        if per_id:
+            column = getattr(models.Submission, field)
+            values[field] = case(per_id, value=models.Submission.id, else_=column)
+    if values:
+        db.query(models.Submission).filter(models.Submission.id.in_(ids)).update(values, synchronize_session=False)
+    db.commit()
+
+    return db.query(models.Submission).options(joinedload(models.Submission.student)).filter(
+        models.Submission.id.in_(ids)
+    ).order_by(models.Submission.id).all()
+
 @router.post("/upload", response_model=dict)
 def upload_submission_file(
     file: UploadFile = File(...),
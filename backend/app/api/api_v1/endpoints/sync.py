@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Any, Optional
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app import models, schemas, sync
+from app.api import deps
+from app.db.session import get_db
+
+router = APIRouter()
+
+@router.get("/sync", response_model=schemas.SyncChanges)
+def sync_changes(
+    since: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    The user's profile, classes, assignments and submissions changed after
+    ``since``, and those deleted. Without ``since`` everything visible is
+    returned; clients then send back the ``watermark`` of each response.
+    A ``since`` older than the tombstone retention gets everything too, with
+    ``full_resync`` set: the client must replace its local copy.
+    """
+    sync.maybe_prune_tombstones(db)
+    return sync.changes(db, current_user, since)
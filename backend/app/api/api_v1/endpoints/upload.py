@@ -1,10 +1,11 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from typing import List
+from typing import Any, List
 import shutil
 import os
 from pathlib import Path
 from app import models, schemas
 from app.api import deps
+from app.core.cache import response_cache
 from app.core.config import settings
 
 router = APIRouter()
@@ -46,19 +47,23 @@ async def upload_avatar(
 @router.get("/avatars/defaults", response_model=List[str])
 async def list_default_avatars():
     """List available default avatars"""
-    defaults = []
-    if DEFAULTS_DIR.exists():
-        for file in DEFAULTS_DIR.iterdir():
-            if file.is_file() and file.suffix.lower() in ['.png', '.jpg', '.jpeg', '.webp']:
-                defaults.append(f"/static/avatars/defaults/{file.name}")
-    return defaults
+    def load() -> List[str]:
+        defaults: List[str] = []
+        if DEFAULTS_DIR.exists():
+            for file in DEFAULTS_DIR.iterdir():
+                if file.is_file() and file.suffix.lower() in ['.png', '.jpg', '.jpeg', '.webp']:
+                    defaults.append(f"/static/avatars/defaults/{file.name}")
+        return defaults
+
+    # The defaults only change on deploy
+    return response_cache.get_or_set("avatars", {"dir": "defaults"}, load, ttl=3600)
 
 @router.post("/avatar/default", response_model=schemas.User)
 async def select_default_avatar(
     avatar_url: str,
     current_user: models.User = Depends(deps.get_current_active_user),
     db = Depends(deps.get_db)
-):
+) -> Any:
     """Select a default avatar"""
     # Validate that the URL points to a valid default avatar
     if not avatar_url.startswith("/static/avatars/defaults/"):
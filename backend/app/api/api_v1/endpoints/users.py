@@ -1,17 +1,33 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 import os
 import shutil
 from datetime import datetime
 
-from app import models, schemas
+from app import models, schemas, search
 from app.api import deps
+from app.core.cache import response_cache
 from app.db.session import get_db
+from app.roster import RosterImport, read_rows
 from app.core.security import get_password_hash
 
 router = APIRouter()
 
+def _teacher_scopes(db: Session, user_id: Any) -> List[str]:
+    """Cache scopes of class payloads that show this user as the teacher."""
+    class_ids: List[int] = list(db.scalars(select(models.Class.id).where(models.Class.teacher_id == user_id)))
+    if not class_ids:
+        return []
+    student_ids = db.query(models.student_class.c.student_id).filter(
+        models.student_class.c.class_id.in_(class_ids)
+    ).distinct()
+    scopes = ["classes:all", f"classes:teacher:{user_id}"]
+    scopes.extend(f"class:{class_id}" for class_id in class_ids)
+    scopes.extend(f"classes:student:{student_id}" for (student_id,) in student_ids)
+    return scopes
+
 @router.get("/", response_model=List[schemas.User])
 def list_users(
     db: Session = Depends(get_db),
@@ -35,6 +51,49 @@ def read_user_me(
     """
     return current_user
 
+@router.get("/search", response_model=List[schemas.User])
+def search_users(
+    q: str = Query(..., min_length=1, max_length=100),
+    role: Optional[models.UserRole] = None,
+    class_id: Optional[int] = None,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Typeahead over names and emails, tolerant of typos and missing accents.
+    Teachers only find students of their own classes.
+    """
+    if current_user.role not in (models.UserRole.ADMIN, models.UserRole.TEACHER):
+        raise HTTPException(status_code=403, detail="Không đủ quyền truy cập")
+
+    condition, score = search.fuzzy(db, [models.User.full_name, models.User.email], q)
+    query = db.query(models.User).filter(condition)
+    if current_user.role == models.UserRole.TEACHER or class_id is not None:
+        enrolled = db.query(models.student_class.c.student_id).join(
+            models.Class, models.Class.id == models.student_class.c.class_id
+        )
+        if current_user.role == models.UserRole.TEACHER:
+            enrolled = enrolled.filter(models.Class.teacher_id == current_user.id)
+        if class_id is not None:
+            enrolled = enrolled.filter(models.Class.id == class_id)
+        query = query.filter(models.User.id.in_(enrolled))
+    if role is not None:
+        query = query.filter(models.User.role == role)
+    return query.order_by(score.desc(), models.User.full_name, models.User.id).limit(limit).all()
+
+@router.get("/batch", response_model=List[schemas.User])
+def get_users_batch(
+    ids: List[int] = Query(..., max_length=100),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Several users at once, e.g. to resolve the ids in compact socket events.
+    Unknown ids are left out.
+    """
+    return db.query(models.User).filter(models.User.id.in_(set(ids))).all()
+
 @router.get("/{user_id}", response_model=schemas.User)
 def get_user(
     user_id: int,
@@ -57,7 +116,7 @@ def create_user(
         raise HTTPException(status_code=403, detail="Không đủ quyền truy cập")
     
     # Check if user already exists
-    existing_user = db.query(models.User).filter(models.User.email == user_in.email).first()
+    existing_user = db.query(models.User).filter(func.lower(models.User.email) == user_in.email.lower()).first()
     if existing_user:
         raise HTTPException(status_code=400, detail="Email đã được đăng ký")
     
@@ -73,6 +132,37 @@ def create_user(
     db.refresh(user)
     return user
 
+@router.post("/import", response_model=schemas.RosterImportResult)
+def import_roster(
+    file: UploadFile = File(...),
+    default_password: Optional[str] = Form(None),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Create or update users and enrollments from a CSV or JSONL roster.
+    Invalid rows are skipped and listed in the result.
+    """
+    if current_user.role != models.UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Không đủ quyền truy cập")
+
+    roster = RosterImport(db, default_password)
+    try:
+        result = roster.run(read_rows(file.file, file.filename or ""))
+    except UnicodeDecodeError:
+        # Batches before the undecodable line are already committed
+        db.rollback()
+        raise HTTPException(
+            status_code=400, detail="Tệp phải được mã hóa UTF-8 (trong Excel: lưu dưới dạng CSV UTF-8)"
+        )
+    finally:
+        response_cache.invalidate(
+            "classes:all",
+            *(f"classes:student:{student_id}" for student_id in roster.enrolled_students),
+            *(f"assignments:student:{student_id}" for student_id in roster.enrolled_students),
+        )
+    return result
+
 @router.put("/{user_id}", response_model=schemas.User)
 def update_user(
     user_id: int,
@@ -102,6 +192,8 @@ def update_user(
     
     db.commit()
     db.refresh(user)
+    if user_in.email or user_in.full_name:
+        response_cache.invalidate(*_teacher_scopes(db, user.id))
     return user
 
 @router.delete("/{user_id}")
@@ -148,5 +240,6 @@ def upload_avatar(
     db.add(current_user)
     db.commit()
     db.refresh(current_user)
+    response_cache.invalidate(*_teacher_scopes(db, current_user.id))
     
     return {"url": current_user.avatar_url}
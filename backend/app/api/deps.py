@@ -9,7 +9,7 @@ from app import models, schemas
 from app.core import security
 from app.db.session import SessionLocal
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import get_db as get_db  # re-exported for endpoints
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"/api/v1/login/access-token"
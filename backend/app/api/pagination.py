@@ -0,0 +1,61 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[ColumnElement[Any]]) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        return [
+            datetime.fromisoformat(v) if v is not None and column.type.python_type is datetime else v
+            for v, column in zip(values, columns)
+        ]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Con trỏ phân trang không hợp lệ")
+
+
+def keyset_page(
+    query: "Query[Any]",
+    columns: Sequence[ColumnElement[Any]],
+    *,
+    descending: bool = False,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page of ``query`` ordered by ``columns`` (the last of which must
+    be unique) starting after ``cursor``. Returns the rows and the cursor of
+    the next page, or None on the last page. Each column must be readable on
+    the returned rows under its key: a mapped attribute, or a labelled
+    expression that is also selected by the query.
+
+    Unlike OFFSET, the database seeks straight to the cursor through the
+    index on ``columns``, so deep pages cost the same as the first one.
+    ``skip`` is only honoured without a cursor, for older clients.
+    """
+    key = tuple_(*columns)
+    if cursor is not None:
+        after = tuple_(*decode_cursor(cursor, columns))
+        query = query.filter(key < after if descending else key > after)
+    query = query.order_by(*(column.desc() if descending else column.asc() for column in columns))
+    if cursor is None and skip:
+        query = query.offset(skip)
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], str(column.key)) for column in columns])
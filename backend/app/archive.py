@@ -0,0 +1,96 @@
+"""
+"Download all submissions" archives: one folder per student holding the
+files they uploaded and, if they typed an answer, its text.
+"""
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy.orm import Session
+
+from app import models
+
+STATIC_ROOT = Path("static").resolve()
+
+# Characters that are unsafe in archive paths on common platforms
+_UNSAFE = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+# Uploads are saved as <user id>_<timestamp>_<original name>
+_UPLOAD_PREFIX = re.compile(r"^\d+_\d+(\.\d+)?_")
+
+
+def load_submissions(db: Session, assignment_id: int) -> List[Any]:
+    return db.query(
+        models.Submission.id,
+        models.Submission.student_id,
+        models.Submission.submitted_at,
+        models.Submission.content,
+        models.Submission.file_urls,
+        models.User.full_name,
+    ).join(models.User, models.User.id == models.Submission.student_id).filter(
+        models.Submission.assignment_id == assignment_id
+    ).order_by(models.User.full_name, models.Submission.student_id).all()
+
+
+def archive_key(assignment_id: int, submissions: Sequence[Any]) -> str:
+    """
+    Changes whenever a submission is added or resubmitted: resubmitting
+    bumps submitted_at, and the file list guards against edits that don't.
+    """
+    digest = hashlib.sha1()
+    for s in submissions:
+        digest.update(f"{s.id}|{s.submitted_at.isoformat() if s.submitted_at else ''}|{s.file_urls}\n".encode())
+    return f"{assignment_id}-{digest.hexdigest()[:16]}"
+
+
+def _resolve(url: str) -> Optional[str]:
+    path = (STATIC_ROOT.parent / url.lstrip("/")).resolve()
+    # Never follow a stored URL outside the static directory
+    if STATIC_ROOT not in path.parents or not path.is_file():
+        return None
+    return str(path)
+
+
+def archive_entries(submissions: Sequence[Any]) -> Iterator[Tuple[str, Union[str, bytes]]]:
+    for s in submissions:
+        folder = f"{_UNSAFE.sub('_', s.full_name or 'student').strip() or 'student'} ({s.student_id})"
+        used = set()
+        if s.content:
+            used.add("bai_lam.txt")
+            yield f"{folder}/bai_lam.txt", s.content.encode()
+        for url in s.file_urls or []:
+            path = _resolve(url)
+            if path is None:
+                continue
+            name = _UNSAFE.sub("_", _UPLOAD_PREFIX.sub("", os.path.basename(path))) or "file"
+            stem, ext = os.path.splitext(name)
+            n = 1
+            while name in used:
+                n += 1
+                name = f"{stem} ({n}){ext}"
+            used.add(name)
+            yield f"{folder}/{name}", path
+
+
+def cache_archive(chunks: Iterator[bytes], cache_dir: Path, key: str) -> Iterator[bytes]:
+    """
+    Pass ``chunks`` through while saving them as ``<key>.zip``. The file
+    only appears once complete, and replaces older archives of the same
+    assignment; an interrupted download leaves nothing behind.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    target = cache_dir / f"{key}.zip"
+    partial = cache_dir / f"{key}.{os.getpid()}.part"
+    try:
+        with partial.open("wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        partial.replace(target)
+        assignment_id = key.split("-", 1)[0]
+        for stale in cache_dir.glob(f"{assignment_id}-*.zip"):
+            if stale != target:
+                stale.unlink(missing_ok=True)
+    finally:
+        partial.unlink(missing_ok=True)
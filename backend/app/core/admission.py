@@ -0,0 +1,205 @@
+import asyncio
+import heapq
+import itertools
+import math
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class RouteGroup:
+    """
+    Requests admitted under one policy, matched by path prefix or by a
+    ``patterns`` regex fullmatching the path. Lower ``priority`` values are
+    served first when requests queue; ``max_concurrency`` caps the group
+    below the shared capacity so a burst in one group cannot starve the
+    others. A group that is not ``shared`` (long downloads, say) takes no
+    slot of the shared capacity at all and is bounded only by its own cap.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        prefixes: Sequence[str] = (),
+        patterns: Sequence[str] = (),
+        methods: Optional[Iterable[str]] = None,
+        priority: int = 0,
+        max_concurrency: Optional[int] = None,
+        max_queue: int = 100,
+        max_wait: float = 5.0,
+        shared: bool = True,
+    ) -> None:
+        if not shared and max_concurrency is None:
+            raise ValueError("An unshared route group needs max_concurrency")
+        self.name = name
+        self.prefixes = tuple(prefixes)
+        self.pattern = re.compile("|".join(f"(?:{p})" for p in patterns)) if patterns else None
+        self.methods: Optional[FrozenSet[str]] = frozenset(methods) if methods else None
+        self.priority = priority
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.shared = shared
+        self.in_flight = 0
+        self.queued = 0
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods is not None and method not in self.methods:
+            return False
+        if path.startswith(self.prefixes):
+            return True
+        return self.pattern is not None and self.pattern.fullmatch(path) is not None
+
+
+class AdmissionController:
+    """
+    Bounds the requests a worker runs at once. Past ``capacity`` requests
+    wait in a priority queue for at most their group's ``max_wait``; a full
+    queue or an expired wait is answered 503 straight away, which is far
+    cheaper for everyone than letting the request pile onto the threadpool
+    and database.
+
+    State lives on the worker's event loop and is only touched from it.
+    """
+
+    def __init__(self, capacity: int, groups: Sequence[RouteGroup], default: RouteGroup) -> None:
+        self.capacity = capacity
+        self.groups = list(groups)
+        self.default = default
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, RouteGroup, "asyncio.Future[bool]"]] = []
+        self._order = itertools.count()
+        self._rejected: Dict[Tuple[str, str], int] = {}
+
+    def classify(self, method: str, path: str) -> RouteGroup:
+        for group in self.groups:
+            if group.matches(method, path):
+                return group
+        return self.default
+
+    def _has_room(self, group: RouteGroup) -> bool:
+        if group.shared and self.in_flight >= self.capacity:
+            return False
+        return group.max_concurrency is None or group.in_flight < group.max_concurrency
+
+    def _start(self, group: RouteGroup) -> None:
+        if group.shared:
+            self.in_flight += 1
+        group.in_flight += 1
+
+    def _reject(self, group: RouteGroup, reason: str) -> None:
+        self._rejected[(group.name, reason)] = self._rejected.get((group.name, reason), 0) + 1
+
+    async def acquire(self, group: RouteGroup) -> bool:
+        if not self._waiters and self._has_room(group):
+            self._start(group)
+            return True
+        if group.queued >= group.max_queue:
+            self._reject(group, "queue_full")
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (group.priority, next(self._order), group, future))
+        group.queued += 1
+        # Others may be waiting only on their group's cap; this one may fit now
+        self._wake()
+        try:
+            await asyncio.wait({future}, timeout=group.max_wait)
+        except asyncio.CancelledError:
+            # Client went away; hand back a slot granted in the meantime
+            if future.done() and not future.cancelled():
+                self.release(group)
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+                group.queued -= 1
+        if future.cancelled():
+            self._reject(group, "timeout")
+            return False
+        return True
+
+    def release(self, group: RouteGroup) -> None:
+        if group.shared:
+            self.in_flight -= 1
+        group.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        blocked = []
+        # Unshared groups may have room while the shared capacity is full
+        while self._waiters:
+            entry = heapq.heappop(self._waiters)
+            _, _, group, future = entry
+            if future.done():
+                continue
+            if not self._has_room(group):
+                # No room for it yet; leave it queued for a later release
+                blocked.append(entry)
+                continue
+            group.queued -= 1
+            self._start(group)
+            future.set_result(True)
+        for entry in blocked:
+            heapq.heappush(self._waiters, entry)
+
+    def render_metrics(self) -> str:
+        lines = [
+            "# HELP admission_in_flight Requests currently running by route group.",
+            "# TYPE admission_in_flight gauge",
+        ]
+        groups = [*self.groups, self.default]
+        lines += [f'admission_in_flight{{group="{g.name}"}} {g.in_flight}' for g in groups]
+        lines += [
+            "# HELP admission_queue_depth Requests waiting for admission by route group.",
+            "# TYPE admission_queue_depth gauge",
+        ]
+        lines += [f'admission_queue_depth{{group="{g.name}"}} {g.queued}' for g in groups]
+        lines += [
+            "# HELP admission_rejected_total Requests shed with 503 by route group and reason.",
+            "# TYPE admission_rejected_total counter",
+        ]
+        for (group, reason), count in sorted(self._rejected.items()):
+            lines.append(f'admission_rejected_total{{group="{group}",reason="{reason}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+class AdmissionMiddleware:
+    """
+    Applies an AdmissionController to HTTP requests whose path matches none
+    of the ``exempt`` patterns, e.g. long-lived event streams that would
+    otherwise hold a slot for as long as they are open.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController, exempt: Sequence[str] = ()) -> None:
+        self.app = app
+        self.controller = controller
+        self.exempt = re.compile("|".join(f"(?:{pattern})" for pattern in exempt)) if exempt else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (self.exempt and self.exempt.fullmatch(scope["path"])):
+            await self.app(scope, receive, send)
+            return
+
+        group = self.controller.classify(scope["method"], scope["path"])
+        if not await self.controller.acquire(group):
+            retry_after = str(max(1, math.ceil(group.max_wait)))
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"retry-after", retry_after.encode()),
+                ],
+            })
+            await send({
+                "type": "http.response.body",
+                "body": '{"detail":"Máy chủ đang quá tải, vui lòng thử lại sau"}'.encode(),
+            })
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(group)
@@ -0,0 +1,137 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Tuple
+
+from app.core.config import settings
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Any: ...
+
+    def set(self, key: str, value: Any, ttl: int) -> None: ...
+
+    def get_version(self, scope: str) -> int: ...
+
+    def bump_versions(self, scopes: Iterable[str]) -> None: ...
+
+
+class MemoryBackend:
+    """Per-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # Versions are never evicted: losing one would resurrect stale entries
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_version(self, scope: str) -> int:
+        return self._versions.get(scope, 0)
+
+    def bump_versions(self, scopes: Iterable[str]) -> None:
+        with self._lock:
+            for scope in scopes:
+                self._versions[scope] = self._versions.get(scope, 0) + 1
+
+
+class RedisBackend:
+    """Shared backend so every worker sees the same entries and invalidations."""
+
+    def __init__(self, url: str) -> None:
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from e
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Any:
+        raw = self._client.get(f"cache:{key}")
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        self._client.set(f"cache:{key}", json.dumps(value), ex=ttl)
+
+    def get_version(self, scope: str) -> int:
+        return int(self._client.get(f"cache-version:{scope}") or 0)
+
+    def bump_versions(self, scopes: Iterable[str]) -> None:
+        pipe = self._client.pipeline(transaction=False)
+        for scope in scopes:
+            pipe.incr(f"cache-version:{scope}")
+        pipe.execute()
+
+
+class ResponseCache:
+    """
+    Read-through cache for endpoint payloads. Entries live in a scope (e.g.
+    ``classes:student:12``); invalidating a scope bumps its version, which
+    orphans every entry cached under the old version in O(1).
+
+    Cached values must be JSON-compatible so any backend can hold them.
+    """
+
+    def __init__(self, backend: CacheBackend, default_ttl: int) -> None:
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def get_or_set(self, scope: str, params: Dict[str, Any], loader: Callable[[], Any], ttl: Optional[int] = None) -> Any:
+        args = "&".join(f"{name}={params[name]}" for name in sorted(params))
+        key = f"{scope}:v{self.backend.get_version(scope)}:{args}"
+        value = self.backend.get(key)
+        namespace = scope.split(":", 1)[0]
+        if value is not None:
+            self._count(namespace, "hit")
+            return value
+        self._count(namespace, "miss")
+        value = loader()
+        self.backend.set(key, value, ttl or self.default_ttl)
+        return value
+
+    def invalidate(self, *scopes: str) -> None:
+        self.backend.bump_versions(scopes)
+
+    def _count(self, namespace: str, result: str) -> None:
+        with self._lock:
+            self._counts[(namespace, result)] = self._counts.get((namespace, result), 0) + 1
+
+    def render_metrics(self) -> str:
+        lines: List[str] = [
+            "# HELP cache_requests_total Response cache lookups by namespace and result.",
+            "# TYPE cache_requests_total counter",
+        ]
+        with self._lock:
+            for (namespace, result), count in sorted(self._counts.items()):
+                lines.append(f'cache_requests_total{{namespace="{namespace}",result="{result}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+def _create_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisBackend(settings.REDIS_URL)
+    return MemoryBackend(settings.CACHE_MAX_ENTRIES)
+
+
+response_cache = ResponseCache(_create_backend(), settings.CACHE_TTL_SECONDS)
@@ -1,4 +1,4 @@
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 
 class Settings(BaseSettings):
@@ -10,12 +10,73 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "password"
     POSTGRES_DB: str = "schoolconnect"
     POSTGRES_PORT: str = "5432"
+    # Full URL override, e.g. sqlite:///./bench.db for local benchmarking
+    DATABASE_URL: Optional[str] = None
+
+    # Instrumentation
+    DEBUG: bool = False
+    SLOW_REQUEST_MS: int = 500
+
+    # Response cache: "memory" (per process) or "redis" (shared by workers)
+    CACHE_BACKEND: str = "memory"
+    CACHE_TTL_SECONDS: int = 60
+    CACHE_MAX_ENTRIES: int = 10000
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Rate limiting: "memory" (per process) or "redis" (shared by workers)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_MAX_KEYS: int = 100000
+
+    # Admission control, per worker: requests run at once, how many may
+    # queue and for how long before being shed with 503. Submissions and
+    # uploads get a smaller share and wait behind everything else.
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENCY: int = 40
+    ADMISSION_MAX_QUEUE: int = 200
+    ADMISSION_MAX_WAIT_SECONDS: float = 5.0
+    ADMISSION_SUBMIT_CONCURRENCY: int = 16
+    ADMISSION_SUBMIT_MAX_WAIT_SECONDS: float = 10.0
+    # Gradebook exports and submission archives stream for a long time: they
+    # run outside the shared capacity, at most this many at once
+    ADMISSION_DOWNLOAD_CONCURRENCY: int = 4
+    ADMISSION_DOWNLOAD_MAX_WAIT_SECONDS: float = 10.0
+
+    # WebSocket handshakes: verified tokens are reused for this long, so a
+    # deactivated user may keep connecting for up to this many seconds
+    WS_AUTH_CACHE_SECONDS: int = 60
+    WS_AUTH_CACHE_MAX_ENTRIES: int = 10000
+
+    # Server-Sent Events: events kept per topic for Last-Event-ID resume and
+    # for how long after its last stream closes, events buffered per slow
+    # client, seconds between keep-alive comments
+    SSE_HISTORY_SIZE: int = 200
+    SSE_HISTORY_SECONDS: int = 300
+    SSE_QUEUE_SIZE: int = 100
+    SSE_KEEPALIVE_SECONDS: int = 15
+
+    # Seconds presence changes are collected before peers are told
+    PRESENCE_FLUSH_SECONDS: float = 2.0
+
+    # Delta sync: the watermark handed back trails the clock by this much, so
+    # rows stamped just before a slower transaction commits aren't skipped
+    SYNC_OVERLAP_SECONDS: int = 5
+    # Tombstones of deleted rows are kept this long; a client whose ``since``
+    # is older gets a full resync instead of a delta
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30
+
+    # Directory for finished submission ZIPs; unset disables the cache
+    SUBMISSION_ARCHIVE_CACHE_DIR: Optional[str] = None
+
+    # Processes used to hash passwords during roster imports (0 = CPU count)
+    PASSWORD_HASH_WORKERS: int = 0
     
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
+        if self.DATABASE_URL:
+            return self.DATABASE_URL
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
-    class Config:
-        case_sensitive = True
+    model_config = SettingsConfigDict(case_sensitive=True)
 
 settings = Settings()
@@ -0,0 +1,145 @@
+"""
+Server-Sent Events for clients that cannot use WebSockets.
+
+Streams are fed from ConnectionManager.publish, so they carry the same
+events as the sockets. A topic with streams keeps its last SSE_HISTORY_SIZE
+events, and for SSE_HISTORY_SECONDS after its last stream closes, so a
+client reconnecting with Last-Event-ID usually gets only what it missed.
+
+That history is best effort: it lives in this process only, so it is lost
+on restart and unknown to other workers, and it is bounded. Whenever it
+cannot cover a Last-Event-ID (too far behind, evicted, or an id from another
+worker or an earlier run) the stream starts with a "reset" event instead.
+On "reset" a client must drop its local copy, reload it over HTTP, and
+treat the rest of the stream as changes to that reloaded state.
+
+Events that carry a durable ``seq`` from their topic's own log (the class
+Q&A log) skip the history: their id is the seq, and the stream resumes by
+reading that log (see ``log_position``), which survives restarts and works
+whichever worker the client reconnects to.
+"""
+import asyncio
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.responses import dumps
+from app.core.socket_manager import ConnectionManager, manager
+
+# The stream cannot resume where the client left off; see above
+RESET = b"event: reset\ndata: {}\n\n"
+KEEPALIVE = b": keep-alive\n\n"
+
+
+# (seq for logged events, else None; the encoded event), or None to end the stream
+Item = Optional[Tuple[Optional[int], bytes]]
+
+
+def format_event(event_id: str, message: Dict[str, Any]) -> bytes:
+    return b"id: " + event_id.encode() + b"\ndata: " + dumps(message) + b"\n\n"
+
+
+def log_position(last_event_id: Optional[str]) -> Optional[int]:
+    """The log sequence a Last-Event-ID stands for, if it is a durable id."""
+    if last_event_id and last_event_id.isdigit():
+        return int(last_event_id)
+    return None
+
+
+class EventStreams:
+    def __init__(
+        self, connections: ConnectionManager, history_size: int, history_seconds: float, queue_size: int
+    ) -> None:
+        # Ids of unlogged events are "<run>:<n>"; ids from another run can't be resumed
+        self.run = uuid.uuid4().hex[:8]
+        self.history_size = history_size
+        self.history_seconds = history_seconds
+        self.queue_size = queue_size
+        self._sequence: Dict[str, int] = {}
+        self._history: Dict[str, Deque[Tuple[int, bytes]]] = {}
+        self._queues: Dict[str, Set["asyncio.Queue[Item]"]] = {}
+        # Topics whose last stream closed, and when; their history expires
+        self._idle_since: Dict[str, float] = {}
+        connections.publish_listeners.append(self.publish)
+
+    def publish(self, topic: str, message: Dict[str, Any]) -> None:
+        if topic not in self._queues and topic not in self._history:
+            # No stream is, or was recently, interested
+            return
+        seq = message.get("seq")
+        if isinstance(seq, int):
+            # Logged: resumed from the log, not the history
+            item: Tuple[Optional[int], bytes] = (seq, format_event(str(seq), {"topic": topic, **message}))
+        else:
+            n = self._sequence.get(topic, 0) + 1
+            self._sequence[topic] = n
+            # Encoded once, for the history and every stream
+            frame = format_event(f"{self.run}:{n}", {"topic": topic, **message})
+            self._history.setdefault(topic, deque(maxlen=self.history_size)).append((n, frame))
+            item = (None, frame)
+        for queue in list(self._queues.get(topic, ())):
+            try:
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                # Too slow to keep up: end its stream, it can reconnect
+                # and resume from the history
+                self._drop(topic, queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def _drop(self, topic: str, queue: "asyncio.Queue[Item]") -> None:
+        queues = self._queues.get(topic)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._queues[topic]
+                self._idle_since[topic] = time.monotonic()
+
+    def _prune(self) -> None:
+        expired = time.monotonic() - self.history_seconds
+        for topic, since in list(self._idle_since.items()):
+            if since < expired:
+                del self._idle_since[topic]
+                self._history.pop(topic, None)
+
+    def _backlog(self, topic: str, last_event_id: Optional[str]) -> List[bytes]:
+        if not last_event_id or log_position(last_event_id) is not None:
+            # Nothing to resume, or the caller resumes from the log
+            return []
+        run, _, n = last_event_id.partition(":")
+        history = self._history.get(topic, deque())
+        if run != self.run or not n.isdigit():
+            return [RESET]
+        after = int(n)
+        if after >= self._sequence.get(topic, 0):
+            return []
+        if not history or history[0][0] > after + 1:
+            return [RESET]
+        return [frame for seq, frame in history if seq > after]
+
+    def subscribe(
+        self, topic: str, last_event_id: Optional[str]
+    ) -> Tuple["asyncio.Queue[Item]", List[bytes]]:
+        """
+        A queue of the topic's future events, and the missed ones to send
+        first. For a durable Last-Event-ID nothing is returned as missed: read
+        them from the log after subscribing, and skip queued events already
+        read there.
+        """
+        self._prune()
+        queue: "asyncio.Queue[Item]" = asyncio.Queue(self.queue_size)
+        self._queues.setdefault(topic, set()).add(queue)
+        self._idle_since.pop(topic, None)
+        return queue, self._backlog(topic, last_event_id)
+
+    def unsubscribe(self, topic: str, queue: "asyncio.Queue[Item]") -> None:
+        self._drop(topic, queue)
+        self._prune()
+
+
+event_streams = EventStreams(
+    manager, settings.SSE_HISTORY_SIZE, settings.SSE_HISTORY_SECONDS, settings.SSE_QUEUE_SIZE
+)
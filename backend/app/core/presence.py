@@ -0,0 +1,129 @@
+"""
+Online status for chat, derived from the socket manager's user registry.
+
+A user is online while they hold at least one authenticated socket in this
+worker. Changes are not pushed as they happen: they are collected and
+flushed every PRESENCE_FLUSH_SECONDS, so a user reconnecting, or opening and
+closing tabs, within one interval produces no update at all. Each flush
+sends each online peer a single "presence" event covering all of them.
+
+A user's conversation peers are looked up once, when they come online, and
+kept while they stay online; messages published meanwhile add new peers.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import models
+from app.core.config import settings
+from app.core.socket_manager import ConnectionManager, manager, user_topic
+from app.db.session import in_session
+
+logger = logging.getLogger(__name__)
+
+
+def conversation_peers(db: Session, user_ids: Iterable[int]) -> Set[Tuple[int, int]]:
+    """(user, peer) pairs for everyone the users have exchanged messages with."""
+    ids = list(user_ids)
+    pairs: Sequence[Tuple[int, int]] = db.query(models.Message.sender_id, models.Message.receiver_id).filter(
+        or_(models.Message.sender_id.in_(ids), models.Message.receiver_id.in_(ids))
+    ).distinct().all()
+    wanted = set(ids)
+    # A conversation with messages both ways comes back as two rows
+    result: Set[Tuple[int, int]] = set()
+    for sender_id, receiver_id in pairs:
+        if sender_id in wanted:
+            result.add((sender_id, receiver_id))
+        if receiver_id in wanted:
+            result.add((receiver_id, sender_id))
+    return result
+
+
+class PresenceTracker:
+    def __init__(self, connections: ConnectionManager, interval: float) -> None:
+        self.connections = connections
+        self.interval = interval
+        # Last disconnect per user, for "last seen"
+        self.last_seen: Dict[int, datetime] = {}
+        # Users whose status changed since the last flush
+        self._pending: Set[int] = set()
+        # Users peers were last told are online
+        self._announced: Set[int] = set()
+        # Conversation peers of announced users
+        self._peers: Dict[int, Set[int]] = {}
+        self._task: Optional["asyncio.Task[None]"] = None
+        connections.presence_listeners.append(self._changed)
+        connections.publish_listeners.append(self._published)
+
+    def status(self, user_id: int) -> Tuple[bool, Optional[datetime]]:
+        online = self.connections.is_online(user_id)
+        return online, None if online else self.last_seen.get(user_id)
+
+    def _changed(self, user_id: int, online: bool) -> None:
+        if not online:
+            self.last_seen[user_id] = datetime.utcnow()
+        self._pending.add(user_id)
+        if self._task is None or self._task.done():
+            # Socket callbacks run on the event loop, so one is running
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def _published(self, topic: str, message: Dict[str, Any]) -> None:
+        if message.get("type") != "new_message":
+            return
+        sender_id, receiver_id = message["message"]["sender_id"], message["message"]["receiver_id"]
+        if sender_id in self._peers:
+            self._peers[sender_id].add(receiver_id)
+        if receiver_id in self._peers:
+            self._peers[receiver_id].add(sender_id)
+
+    async def _run(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Presence flush failed")
+
+    async def flush(self) -> None:
+        changed: Dict[int, bool] = {}
+        for user_id in self._pending:
+            online = self.connections.is_online(user_id)
+            # Back where peers last saw it, e.g. a quick reconnect
+            if online != (user_id in self._announced):
+                changed[user_id] = online
+                if online:
+                    self._announced.add(user_id)
+                else:
+                    self._announced.discard(user_id)
+        self._pending.clear()
+        if not changed:
+            return
+
+        unknown = [user_id for user_id in changed if user_id not in self._peers]
+        if unknown:
+            pairs = await run_in_threadpool(in_session, conversation_peers, unknown)
+            for user_id in unknown:
+                self._peers[user_id] = set()
+            for user_id, peer_id in pairs:
+                self._peers[user_id].add(peer_id)
+
+        updates: Dict[int, List[Dict[str, Any]]] = {}
+        for user_id, online in changed.items():
+            # As announced above, even if it changed again during the lookup
+            last_seen = None if online else self.last_seen.get(user_id)
+            peers = self._peers[user_id] if online else self._peers.pop(user_id)
+            for peer_id in peers:
+                if peer_id != user_id and self.connections.is_online(peer_id):
+                    updates.setdefault(peer_id, []).append(
+                        {"user_id": user_id, "online": online, "last_seen": last_seen}
+                    )
+        for peer_id, users in updates.items():
+            await self.connections.publish(user_topic(peer_id), {"type": "presence", "users": users})
+
+
+presence = PresenceTracker(manager, settings.PRESENCE_FLUSH_SECONDS)
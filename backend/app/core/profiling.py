@@ -0,0 +1,235 @@
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets, Prometheus defaults
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0,
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestStats:
+    """Timings collected for a single HTTP request."""
+
+    __slots__ = ("started", "db_time", "statements", "slowest_time", "slowest_statement")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.db_time = 0.0
+        self.statements = 0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record_statement(self, statement: str, elapsed: float) -> None:
+        self.db_time += elapsed
+        self.statements += 1
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+    @property
+    def wall_time(self) -> float:
+        return time.perf_counter() - self.started
+
+
+# The stats object is shared by reference, so statements executed from the
+# threadpool (sync endpoints) still land on the request that issued them.
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current_stats.get()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach cursor execution hooks that feed the per-request stats."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(
+        conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(
+        conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record_statement(statement, elapsed)
+
+
+class _RouteMetrics:
+    __slots__ = ("bucket_counts", "count", "total", "db_total", "statements", "statuses")
+
+    def __init__(self) -> None:
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.db_total = 0.0
+        self.statements = 0
+        self.statuses: Dict[int, int] = {}
+
+
+class MetricsRegistry:
+    """Per-route latency histograms rendered in Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._routes: Dict[Tuple[str, str], _RouteMetrics] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, route: str, status: int, stats: RequestStats, wall_time: float) -> None:
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = _RouteMetrics()
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if wall_time <= bound:
+                    metrics.bucket_counts[i] += 1
+                    break
+            metrics.count += 1
+            metrics.total += wall_time
+            metrics.db_total += stats.db_time
+            metrics.statements += stats.statements
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def render(self) -> str:
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines: List[str] = [
+                "# HELP http_request_duration_seconds Request wall time by route.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), metrics in routes:
+                labels = f'method="{method}",route="{_escape(route)}"'
+                cumulative = 0
+                for bound, bucket_count in zip(LATENCY_BUCKETS, metrics.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {metrics.count}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {metrics.total}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {metrics.count}")
+
+            lines.append("# HELP http_requests_total Requests by route and status code.")
+            lines.append("# TYPE http_requests_total counter")
+            for (method, route), metrics in routes:
+                for status, count in sorted(metrics.statuses.items()):
+                    lines.append(
+                        f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}'
+                    )
+
+            lines.append("# HELP db_query_duration_seconds_total Time spent in SQL statements by route.")
+            lines.append("# TYPE db_query_duration_seconds_total counter")
+            for (method, route), metrics in routes:
+                lines.append(
+                    f'db_query_duration_seconds_total{{method="{method}",route="{_escape(route)}"}} {metrics.db_total}'
+                )
+
+            lines.append("# HELP db_statements_total SQL statements executed by route.")
+            lines.append("# TYPE db_statements_total counter")
+            for (method, route), metrics in routes:
+                lines.append(
+                    f'db_statements_total{{method="{method}",route="{_escape(route)}"}} {metrics.statements}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics_registry = MetricsRegistry()
+
+
+class ProfilingMiddleware:
+    """
+    Times every HTTP request, counts its SQL statements and records the
+    result in the metrics registry. Slow requests are logged, and in debug
+    mode the timings are exposed as a Server-Timing header.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = metrics_registry) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        status_code = 500
+        event_stream = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, event_stream
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                event_stream = any(
+                    name == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", [])
+                )
+                if settings.DEBUG:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(stats).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            wall_time = stats.wall_time
+            route_path = _route_template(scope)
+            self.registry.observe(scope["method"], route_path, status_code, stats, wall_time)
+            # Event streams are open for as long as the client listens
+            if wall_time * 1000 >= settings.SLOW_REQUEST_MS and not event_stream:
+                logger.warning(
+                    "Slow request %s %s: %.1fms total, %.1fms in %d statements, slowest %.1fms: %s",
+                    scope["method"],
+                    route_path,
+                    wall_time * 1000,
+                    stats.db_time * 1000,
+                    stats.statements,
+                    stats.slowest_time * 1000,
+                    # Multi-row INSERTs can be megabytes of placeholders
+                    (stats.slowest_statement or "")[:500],
+                )
+
+
+def _route_template(scope: Scope) -> str:
+    """
+    Full path template of the matched route, e.g. /api/v1/classes/{class_id}.
+    Routes of included routers may only know their local path, so the mount
+    prefix is recovered from the concrete request path.
+    """
+    route = scope.get("route")
+    path_regex = getattr(route, "path_regex", None)
+    if route is None or path_regex is None:
+        return UNMATCHED_ROUTE
+    match = re.search(path_regex.pattern.lstrip("^"), scope["path"])
+    prefix = scope["path"][: match.start()] if match else ""
+    return prefix + str(route.path)
+
+
+def _server_timing(stats: RequestStats) -> str:
+    return (
+        f"app;dur={stats.wall_time * 1000:.1f}, "
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.statements} statements", '
+        f"db-slowest;dur={stats.slowest_time * 1000:.1f}"
+    )
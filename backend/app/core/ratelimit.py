@@ -0,0 +1,206 @@
+import copy
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Protocol, Tuple
+
+from fastapi import HTTPException, Request
+from jose import JWTError, jwt
+
+from app.core import security
+from app.core.config import settings
+
+_RATE = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour)\s*$")
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+
+class RateLimitBackend(Protocol):
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Take one token; return 0 if granted, else seconds until one is available."""
+        ...
+
+
+class MemoryBackend:
+    """Per-process buckets, least recently used evicted past ``max_keys``."""
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+# Refill and take atomically, in one round trip
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBackend:
+    """Shared buckets so a client's budget holds across every worker."""
+
+    def __init__(self, url: str) -> None:
+        try:
+            from redis import asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package") from e
+        self._take = redis.Redis.from_url(url).register_script(_TAKE_SCRIPT)
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        return float(await self._take(keys=[f"ratelimit:{key}"], args=[rate, burst, time.time()]))
+
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend) -> None:
+        self.backend = backend
+        self._rejected: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    async def take(self, policy: str, identity: str, rate: float, burst: int) -> float:
+        wait = await self.backend.take(f"{policy}:{identity}", rate, burst)
+        if wait:
+            with self._lock:
+                self._rejected[policy] = self._rejected.get(policy, 0) + 1
+        return wait
+
+    def render_metrics(self) -> str:
+        lines: List[str] = [
+            "# HELP rate_limited_requests_total Requests rejected with 429 by policy.",
+            "# TYPE rate_limited_requests_total counter",
+        ]
+        with self._lock:
+            for policy, count in sorted(self._rejected.items()):
+                lines.append(f'rate_limited_requests_total{{policy="{policy}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+def _create_backend() -> RateLimitBackend:
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisBackend(settings.REDIS_URL)
+    return MemoryBackend(settings.RATE_LIMIT_MAX_KEYS)
+
+
+rate_limiter = RateLimiter(_create_backend())
+
+
+def _client_ip(request: Request) -> str:
+    # Behind a proxy, run the server with --proxy-headers / forwarded_allow_ips
+    return request.client.host if request.client else "unknown"
+
+
+def _token_subject(request: Request) -> Optional[str]:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        subject: Optional[str] = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM]).get("sub")
+        return subject
+    except JWTError:
+        return None
+
+
+class RateLimit:
+    """
+    Dependency enforcing a token bucket of ``rate`` (e.g. "10/minute") with
+    room for ``burst`` back-to-back requests, answering 429 with Retry-After
+    once it is empty. Buckets are keyed by ``key``:
+
+    - "ip": the client address
+    - "user": the bearer token's subject, falling back to the address
+    - "username": the username field of a login form, so guesses against one
+      account are throttled whichever addresses they come from
+
+    ``methods``/``paths`` narrow a policy attached to a whole router down to
+    some of its routes (paths as declared in the endpoint module); ``only()``
+    does the same for a copy sharing the original's buckets.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: str,
+        *,
+        burst: Optional[int] = None,
+        key: str = "ip",
+        methods: Optional[Iterable[str]] = None,
+        paths: Optional[Iterable[str]] = None,
+    ) -> None:
+        match = _RATE.match(rate)
+        if not match:
+            raise ValueError(f"Invalid rate {rate!r}, expected e.g. '10/minute'")
+        if key not in ("ip", "user", "username"):
+            raise ValueError(f"Invalid rate limit key {key!r}")
+        count, period = int(match.group(1)), match.group(2)
+        self.name = name
+        self.rate = count / _PERIODS[period]
+        self.burst = burst or count
+        self.key = key
+        self.methods = frozenset(methods) if methods else None
+        self.paths = frozenset(paths) if paths else None
+
+    def only(self, *, methods: Optional[Iterable[str]] = None, paths: Optional[Iterable[str]] = None) -> "RateLimit":
+        narrowed = copy.copy(self)
+        if methods:
+            narrowed.methods = frozenset(methods)
+        if paths:
+            narrowed.paths = frozenset(paths)
+        return narrowed
+
+    async def _identity(self, request: Request) -> str:
+        if self.key == "user":
+            subject = _token_subject(request)
+            return f"user:{subject}" if subject else f"ip:{_client_ip(request)}"
+        if self.key == "username":
+            # Starlette caches the parsed form, so the endpoint does not re-read it
+            username = (await request.form()).get("username")
+            return f"username:{str(username or '').strip().lower()}"
+        return f"ip:{_client_ip(request)}"
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        if self.methods is not None and request.method not in self.methods:
+            return
+        if self.paths is not None:
+            route = request.scope.get("route")
+            if getattr(route, "path", None) not in self.paths:
+                return
+        wait = await rate_limiter.take(self.name, await self._identity(request), self.rate, self.burst)
+        if wait:
+            raise HTTPException(
+                status_code=429,
+                detail="Quá nhiều yêu cầu, vui lòng thử lại sau",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
@@ -0,0 +1,16 @@
+from typing import Any
+
+import orjson
+from starlette.responses import JSONResponse
+
+
+def dumps(content: Any) -> bytes:
+    """orjson encoding with native datetime, date, UUID and dataclass support."""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """Opt-in JSON response rendered with orjson instead of the stdlib encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
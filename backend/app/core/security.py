@@ -1,5 +1,8 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+from typing import Any, List, Union, Optional
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
@@ -27,3 +30,31 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+# Created on first use, so in the serving process rather than before a fork,
+# and owned by the process that created it
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_pid: Optional[int] = None
+_hash_pool_lock = threading.Lock()
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool, _hash_pool_pid
+    with _hash_pool_lock:
+        if _hash_pool is None or _hash_pool_pid != os.getpid():
+            _hash_pool = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS or None)
+            _hash_pool_pid = os.getpid()
+        return _hash_pool
+
+def shutdown_hash_pool() -> None:
+    """Stop the hashing processes; called when the app shuts down."""
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is not None and _hash_pool_pid == os.getpid():
+            _hash_pool.shutdown(wait=True, cancel_futures=True)
+        _hash_pool = None
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash many passwords across worker processes; bcrypt is CPU bound."""
+    if len(passwords) < 2:
+        return [get_password_hash(p) for p in passwords]
+    return list(_get_hash_pool().map(get_password_hash, passwords, chunksize=16))
@@ -1,42 +1,180 @@
-from typing import List, Dict
+import json
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 from fastapi import WebSocket
+from app.core.responses import dumps
+
+try:
+    import msgpack
+except ImportError:  # Optional: sockets asking for MessagePack get JSON instead
+    msgpack = None
+
+# Subprotocol a client offers to receive (and may send) binary MessagePack
+# frames instead of JSON text. permessage-deflate is negotiated on top by
+# uvicorn's websockets implementation, whatever the framing.
+MSGPACK = "msgpack"
+
+Frame = Union[str, bytes]
+
+
+def class_topic(class_id: int) -> str:
+    """Questions and answers posted in a class."""
+    return f"class:{class_id}:qa"
+
+
+def user_topic(user_id: int) -> str:
+    """Direct messages and notifications for one user."""
+    return f"user:{user_id}"
+
+
+def _msgpack_default(obj: Any) -> Any:
+    if isinstance(obj, date):
+        return obj.isoformat()
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+def encode(message: Dict[str, Any], encoding: str) -> Frame:
+    if encoding == MSGPACK:
+        packed: bytes = msgpack.packb(message, default=_msgpack_default)
+        return packed
+    # orjson handles datetimes natively
+    return dumps(message).decode()
+
+
+def decode(frame: Frame) -> Any:
+    """A client frame: JSON text, or MessagePack if binary."""
+    if isinstance(frame, bytes) and msgpack is not None:
+        return msgpack.unpackb(frame)
+    return json.loads(frame)
+
 
 class ConnectionManager:
-    def __init__(self):
-        # Store active connections: {class_id: [WebSocket]}
-        self.active_connections: Dict[int, List[WebSocket]] = {}
-        # Store user connections: {user_id: WebSocket} (assuming one connection per user for simplicity)
-        self.user_connections: Dict[int, WebSocket] = {}
-
-    async def connect(self, websocket: WebSocket, class_id: int):
-        await websocket.accept()
-        if class_id not in self.active_connections:
-            self.active_connections[class_id] = []
-        self.active_connections[class_id].append(websocket)
-
-    def disconnect(self, websocket: WebSocket, class_id: int):
-        if class_id in self.active_connections:
-            if websocket in self.active_connections[class_id]:
-                self.active_connections[class_id].remove(websocket)
-            if not self.active_connections[class_id]:
-                del self.active_connections[class_id]
-
-    async def broadcast(self, message: dict, class_id: int):
-        if class_id in self.active_connections:
-            for connection in self.active_connections[class_id]:
-                await connection.send_json(message)
-
-    # --- Direct Message Methods ---
-    async def connect_user(self, websocket: WebSocket, user_id: int):
-        await websocket.accept()
-        self.user_connections[user_id] = websocket
-
-    def disconnect_user(self, user_id: int):
-        if user_id in self.user_connections:
-            del self.user_connections[user_id]
-
-    async def send_personal_message(self, message: dict, user_id: int):
-        if user_id in self.user_connections:
-            await self.user_connections[user_id].send_json(message)
+    """
+    Sockets indexed by the topics they subscribe to, so publishing touches
+    only a topic's subscribers however many sockets are open. A socket may
+    hold any number of topics.
+
+    Each socket also has a format: its encoding (JSON or MessagePack) and
+    whether it takes compact events, which reference users by id for the
+    client to resolve from its own cache instead of embedding them.
+
+    Sockets opened for a user are registered under them; presence listeners
+    hear when a user's first socket opens and their last one closes.
+    """
+
+    def __init__(self) -> None:
+        # {topic: {WebSocket}}
+        self.subscribers: Dict[str, Set[WebSocket]] = {}
+        # {WebSocket: {topic}}, to drop a socket from all its topics at once
+        self.subscriptions: Dict[WebSocket, Set[str]] = {}
+        # {WebSocket: (encoding, compact)}
+        self.formats: Dict[WebSocket, Tuple[str, bool]] = {}
+        # {user_id: {WebSocket}} and back
+        self.user_sockets: Dict[int, Set[WebSocket]] = {}
+        self.socket_users: Dict[WebSocket, int] = {}
+        # Called with (user_id, online) on a user's first connect / last disconnect
+        self.presence_listeners: List[Callable[[int, bool], None]] = []
+        # Called with (topic, message) for every published event, in its
+        # compact form if it has one, e.g. SSE streams
+        self.publish_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        *topics: str,
+        subprotocol: Optional[str] = None,
+        compact: bool = False,
+        user_id: Optional[int] = None,
+    ) -> None:
+        encoding = "json"
+        if msgpack is not None and MSGPACK in (websocket.scope.get("subprotocols") or []):
+            encoding = subprotocol = MSGPACK
+        await websocket.accept(subprotocol=subprotocol)
+        self.formats[websocket] = (encoding, compact)
+        self.subscriptions.setdefault(websocket, set())
+        for topic in topics:
+            self.subscribe(websocket, topic)
+        if user_id is not None:
+            self.socket_users[websocket] = user_id
+            sockets = self.user_sockets.setdefault(user_id, set())
+            sockets.add(websocket)
+            if len(sockets) == 1:
+                for listener in self.presence_listeners:
+                    listener(user_id, True)
+
+    def is_online(self, user_id: int) -> bool:
+        return user_id in self.user_sockets
+
+    def subscribe(self, websocket: WebSocket, topic: str) -> None:
+        self.subscribers.setdefault(topic, set()).add(websocket)
+        self.subscriptions.setdefault(websocket, set()).add(topic)
+
+    def unsubscribe(self, websocket: WebSocket, topic: str) -> None:
+        sockets = self.subscribers.get(topic)
+        if sockets is not None:
+            sockets.discard(websocket)
+            if not sockets:
+                del self.subscribers[topic]
+        if websocket in self.subscriptions:
+            self.subscriptions[websocket].discard(topic)
+
+    def disconnect(self, websocket: WebSocket) -> None:
+        self.formats.pop(websocket, None)
+        user_id = self.socket_users.pop(websocket, None)
+        if user_id is not None:
+            own = self.user_sockets.get(user_id, set())
+            own.discard(websocket)
+            if not own:
+                self.user_sockets.pop(user_id, None)
+                for listener in self.presence_listeners:
+                    listener(user_id, False)
+        for topic in self.subscriptions.pop(websocket, set()):
+            sockets = self.subscribers.get(topic)
+            if sockets is not None:
+                sockets.discard(websocket)
+                if not sockets:
+                    del self.subscribers[topic]
+
+    async def send(self, websocket: WebSocket, message: Dict[str, Any]) -> None:
+        """Send to one socket in its encoding."""
+        encoding, _ = self.formats.get(websocket, ("json", False))
+        await self._send(websocket, encode(message, encoding))
+
+    async def _send(self, websocket: WebSocket, frame: Frame) -> None:
+        if isinstance(frame, bytes):
+            await websocket.send_bytes(frame)
+        else:
+            await websocket.send_text(frame)
+
+    async def publish(
+        self,
+        topic: str,
+        message: Dict[str, Any],
+        exclude: Optional[WebSocket] = None,
+        compact: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Send ``message`` to a topic's subscribers; sockets taking compact
+        events get ``compact`` instead, if given.
+        """
+        for listener in self.publish_listeners:
+            listener(topic, message if compact is None else compact)
+        sockets = self.subscribers.get(topic)
+        if not sockets:
+            return
+        # Encode once per format in use, not once per subscriber
+        frames: Dict[Tuple[str, bool], Frame] = {}
+        for connection in list(sockets):
+            if connection is exclude:
+                continue
+            fmt = self.formats.get(connection, ("json", False))
+            if fmt not in frames:
+                body = compact if fmt[1] and compact is not None else message
+                frames[fmt] = encode({"topic": topic, **body}, fmt[0])
+            try:
+                await self._send(connection, frames[fmt])
+            except Exception:
+                # A socket closing mid-send must not stop the fan-out
+                self.disconnect(connection)
 
 manager = ConnectionManager()
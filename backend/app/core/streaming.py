@@ -0,0 +1,61 @@
+import os
+import zipfile
+from typing import IO, Iterable, Iterator, List, Tuple, Union, cast
+
+
+class ChunkBuffer:
+    """
+    Write-only file object for streaming generators. A writer that expects
+    a file (csv, zipfile) writes into it and the generator yields whatever
+    accumulated via ``drain()``, so output never has to be held in full.
+
+    It deliberately has no ``tell``/``seek``: zipfile then writes entries
+    with data descriptors, which needs no going back in the stream.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._size = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return self._size
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self._size = 0
+        return data
+
+
+def zip_chunks(entries: Iterable[Tuple[str, Union[str, bytes]]], chunk_size: int = 256 * 1024) -> Iterator[bytes]:
+    """
+    Stream a ZIP of ``(name, path or content)`` entries as it is built.
+    Files are copied through one reused buffer and stored uncompressed:
+    uploads are mostly PDFs and images that do not shrink anyway.
+    """
+    sink = ChunkBuffer()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with zipfile.ZipFile(cast(IO[bytes], sink), "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, source in entries:
+            if isinstance(source, bytes):
+                archive.writestr(name, source)
+            else:
+                large = os.path.getsize(source) > zipfile.ZIP64_LIMIT
+                with open(source, "rb") as src, archive.open(name, "w", force_zip64=large) as dest:
+                    while True:
+                        read = src.readinto(buffer)
+                        if not read:
+                            break
+                        dest.write(view[:read])
+                        yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
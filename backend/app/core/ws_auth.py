@@ -0,0 +1,146 @@
+"""
+WebSocket authentication.
+
+Browsers cannot set headers on a WebSocket, so the access token comes as the
+``token`` query parameter or as the subprotocol pair ["bearer", <token>],
+which keeps it out of access logs. It is verified once, at the handshake,
+and the identity pinned to the socket for its lifetime: messages on an open
+socket never touch the database.
+
+Verified tokens are cached until they expire (at most WS_AUTH_CACHE_SECONDS)
+so reconnect storms, e.g. after a deploy, don't each cost a user lookup. A
+socket is closed when its token expires unless the client sends a fresh one
+first (see ``refresh``).
+"""
+import asyncio
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple, Union
+
+from fastapi import WebSocket, WebSocketDisconnect, status
+from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
+
+from app import models
+from app.core import security
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+SUBPROTOCOL = "bearer"
+
+
+class SocketUser:
+    """The identity a socket was opened with; enough to authorize topics."""
+
+    __slots__ = ("id", "role", "expires_at")
+
+    def __init__(self, id: int, role: Any, expires_at: float) -> None:
+        self.id = id
+        self.role = role
+        self.expires_at = expires_at
+
+
+class _Cache:
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, SocketUser]]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[SocketUser]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        valid_until, user = entry
+        if valid_until <= time.time():
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return copy.copy(user)
+
+    def set(self, token: str, user: SocketUser) -> None:
+        self._entries[token] = (min(user.expires_at, time.time() + settings.WS_AUTH_CACHE_SECONDS), user)
+        self._entries.move_to_end(token)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# Only touched from the event loop
+_cache = _Cache(settings.WS_AUTH_CACHE_MAX_ENTRIES)
+
+
+def _load_user(user_id: int) -> Optional[Tuple[Any, bool]]:
+    db = SessionLocal()
+    try:
+        return db.query(models.User.role, models.User.is_active).filter(models.User.id == user_id).first()
+    finally:
+        db.close()
+
+
+async def verify(token: Optional[str]) -> Optional[SocketUser]:
+    """The active user ``token`` belongs to, or None."""
+    if not token:
+        return None
+    cached = _cache.get(token)
+    if cached is not None:
+        return cached
+    try:
+        payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
+        user_id, expires_at = int(payload["sub"]), float(payload["exp"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+    row = await run_in_threadpool(_load_user, user_id)
+    if row is None:
+        return None
+    role, is_active = row
+    if not is_active:
+        return None
+    user = SocketUser(user_id, role, expires_at)
+    _cache.set(token, user)
+    return copy.copy(user)
+
+
+def _credentials(websocket: WebSocket) -> Tuple[Optional[str], Optional[str]]:
+    """(token, subprotocol to accept with)"""
+    offered = websocket.scope.get("subprotocols") or []
+    # Other subprotocols (e.g. an encoding) may be offered around the pair
+    if SUBPROTOCOL in offered[:-1]:
+        return offered[offered.index(SUBPROTOCOL) + 1], SUBPROTOCOL
+    return websocket.query_params.get("token"), None
+
+
+async def authenticate(websocket: WebSocket) -> Optional[SocketUser]:
+    """
+    Verify the handshake's token, rejecting the handshake if it is missing
+    or invalid. The subprotocol to accept with, if any, is left in
+    ``websocket.state.subprotocol``.
+    """
+    token, websocket.state.subprotocol = _credentials(websocket)
+    user = await verify(token)
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+    return user
+
+
+async def refresh(user: SocketUser, token: Optional[str]) -> bool:
+    """Extend a socket's session with a newer token of the same user."""
+    fresh = await verify(token)
+    if fresh is None or fresh.id != user.id:
+        return False
+    user.role, user.expires_at = fresh.role, max(user.expires_at, fresh.expires_at)
+    return True
+
+
+async def receive(websocket: WebSocket, user: SocketUser) -> Union[str, bytes]:
+    """
+    The next text or binary frame, closing the socket once ``user``'s
+    token expires.
+    """
+    try:
+        message = await asyncio.wait_for(websocket.receive(), timeout=max(0.0, user.expires_at - time.time()))
+    except asyncio.TimeoutError:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Token expired")
+        raise WebSocketDisconnect(code=status.WS_1008_POLICY_VIOLATION)
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(code=message.get("code", status.WS_1000_NORMAL_CLOSURE))
+    frame: Union[str, bytes] = message["text"] if message.get("text") is not None else message["bytes"]
+    return frame
@@ -3,5 +3,8 @@ from app.models.user import User
 from app.models.class_model import Class
 from app.models.student_class import student_class
 from app.models.assignment import Assignment
-from app.models.qa import Question, Answer
+from app.models.qa import Question, Answer, QAEvent
 
+from app.models.tombstone import Tombstone
+
+__all__ = ["Base", "User", "Class", "student_class", "Assignment", "Question", "Answer", "QAEvent", "Tombstone"]
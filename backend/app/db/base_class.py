@@ -1,4 +1,6 @@
-from typing import Any
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, ClassVar
+from sqlalchemy import Column, DateTime, MetaData, Table
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
 
 @as_declarative()
@@ -6,7 +8,21 @@ class Base:
     id: Any
     __name__: str
 
+    if TYPE_CHECKING:
+        # Set up by as_declarative; the constructor takes column values as keywords
+        metadata: ClassVar[MetaData]
+        __table__: ClassVar[Table]
+
+        def __init__(self, **kwargs: Any) -> None: ...
+
     # Generate __tablename__ automatically
     @declared_attr
     def __tablename__(cls) -> str:
         return cls.__name__.lower()
+
+class Timestamped:
+    """
+    Adds an indexed ``updated_at``, set on insert and by every ORM flush or
+    Core UPDATE that doesn't set it explicitly, for delta sync.
+    """
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
@@ -1,13 +1,29 @@
+from typing import Any, Callable, Dict, Iterator, TypeVar
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from app.core.config import settings
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+connect_args: Dict[str, Any] = {}
+if settings.SQLALCHEMY_DATABASE_URI.startswith("sqlite"):
+    # Sessions are used from the threadpool, not only the creating thread
+    connect_args["check_same_thread"] = False
+
+engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
-def get_db():
+T = TypeVar("T")
+
+def in_session(fn: Callable[..., T], *args: Any) -> T:
+    """Call ``fn(db, *args)`` in a fresh session, e.g. from the threadpool."""
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+def get_db() -> Iterator[Session]:
     db = SessionLocal()
     try:
         yield db
@@ -0,0 +1,157 @@
+"""
+Gradebook export: one row per enrolled student, one column per assignment.
+
+Rows are read through a server-side cursor and encoded as they arrive, so
+memory stays flat however many students and assignments a class has.
+"""
+import csv
+import io
+import re
+import zipfile
+from itertools import groupby
+from typing import IO, Any, Iterable, Iterator, List, Optional, Sequence, Tuple, Unpack, cast
+from xml.sax.saxutils import escape
+
+from sqlalchemy import Select, and_, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.streaming import ChunkBuffer
+from app.db.session import SessionLocal
+
+FETCH_SIZE = 1000
+# Bytes buffered before a chunk is handed to the response
+CHUNK_SIZE = 64 * 1024
+
+Row = List[Any]
+
+
+def load_columns(db: Session, class_id: int) -> List[Tuple[int, str]]:
+    rows: Sequence[Tuple[int, str]] = db.query(models.Assignment.id, models.Assignment.title).filter(
+        models.Assignment.class_id == class_id
+    ).order_by(models.Assignment.due_date, models.Assignment.id).all()
+    return list(rows)
+
+
+def gradebook_rows(class_id: int, assignment_ids: Sequence[int]) -> Iterator[Row]:
+    """
+    Yield [full_name, email, grade per assignment..., average] per student.
+    Runs in its own session: the response outlives the request's one.
+    """
+    position = {assignment_id: i for i, assignment_id in enumerate(assignment_ids)}
+    stmt: Select[Unpack[Tuple[Any, ...]]] = (
+        select(models.User.id, models.User.full_name, models.User.email, models.Submission.assignment_id, models.Submission.grade)
+        .join(models.student_class, models.student_class.c.student_id == models.User.id)
+        .outerjoin(
+            models.Submission,
+            and_(
+                models.Submission.student_id == models.User.id,
+                models.Submission.assignment_id.in_(
+                    select(models.Assignment.id).where(models.Assignment.class_id == class_id)
+                ),
+            ),
+        )
+        .where(models.student_class.c.class_id == class_id)
+        .order_by(models.User.full_name, models.User.id)
+    )
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(stream_results=True, yield_per=FETCH_SIZE))
+        for _, student_rows in groupby(result, key=lambda r: r.id):
+            grades: List[Optional[float]] = [None] * len(position)
+            first = None
+            for r in student_rows:
+                first = first or r
+                if r.assignment_id in position:
+                    grades[position[r.assignment_id]] = r.grade
+            graded = [g for g in grades if g is not None]
+            average = round(sum(graded) / len(graded), 2) if graded else None
+            yield [first.full_name, first.email, *grades, average]
+    finally:
+        db.close()
+
+
+def csv_chunks(header: List[str], rows: Iterable[Row]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    # BOM so Excel opens UTF-8 (Vietnamese names) correctly
+    buffer.write("\ufeff")
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    yield buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+</Types>"""
+
+_ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+
+_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+</Relationships>"""
+
+# Characters XML 1.0 cannot carry at all
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return "<c/>"
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = escape(_INVALID_XML.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(row: Row) -> bytes:
+    return ("<row>" + "".join(_cell(v) for v in row) + "</row>").encode()
+
+
+def xlsx_chunks(header: List[str], rows: Iterable[Row], sheet_name: str = "Gradebook") -> Iterator[bytes]:
+    """
+    A minimal single-sheet workbook written as a streamed ZIP, using inline
+    strings so no shared-string table has to be built up front.
+    """
+    sink = ChunkBuffer()
+    with zipfile.ZipFile(cast(IO[bytes], sink), "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        # Excel caps sheet names at 31 characters and rejects []:*?/\
+        name = escape(re.sub(r"[\[\]:*?/\\]", "", _INVALID_XML.sub("", sheet_name))[:31] or "Gradebook")
+        archive.writestr("xl/workbook.xml", _WORKBOOK.format(name=name))
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(header))
+            yield sink.drain()
+            for row in rows:
+                sheet.write(_xlsx_row(row))
+                if len(sink) >= CHUNK_SIZE:
+                    yield sink.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
@@ -16,6 +16,13 @@ logger = logging.getLogger(__name__)
 def generate_class_code() -> str:
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
 
+def is_seeded(db: Session) -> bool:
+    """Demo data is complete once the admin and the last sample assignment exist."""
+    return (
+        db.query(User.id).filter(User.email == "admin@school.com").first() is not None
+        and db.query(Assignment.id).filter(Assignment.title == "Bài tập 3: Giới hạn").first() is not None
+    )
+
 def init_db(db: Session) -> None:
     # Create default class if it doesn't exist
     default_class = db.query(Class).filter(Class.id == 1).first()
@@ -137,10 +144,16 @@ def init_db(db: Session) -> None:
         logger.info("Created sample assignments")
 
 def main() -> None:
-    logger.info("Creating initial data")
     db = SessionLocal()
-    init_db(db)
-    logger.info("Initial data created")
+    try:
+        if is_seeded(db):
+            logger.info("Initial data already present, skipping")
+            return
+        logger.info("Creating initial data")
+        init_db(db)
+        logger.info("Initial data created")
+    finally:
+        db.close()
 
 if __name__ == "__main__":
     main()
@@ -2,6 +2,12 @@ from .user import User, UserRole
 from .class_model import Class
 from .student_class import student_class
 from .assignment import Assignment
-from .qa import Question, Answer
+from .qa import Question, Answer, QAEvent
 from .message import Message
 from .submission import Submission
+from .tombstone import Tombstone
+
+__all__ = [
+    "User", "UserRole", "Class", "student_class", "Assignment", "Question", "Answer", "QAEvent", "Message",
+    "Submission", "Tombstone",
+]
@@ -1,9 +1,9 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
-from app.db.base_class import Base
+from app.db.base_class import Base, Timestamped
 from datetime import datetime
 
-class Assignment(Base):
+class Assignment(Timestamped, Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True, nullable=False)
     description = Column(Text, nullable=True)
@@ -11,3 +11,5 @@ class Assignment(Base):
     class_id = Column(Integer, ForeignKey("class.id"))
     
     class_ = relationship("Class", backref="assignments")
+
+    __table_args__ = (Index("ix_assignment_class_id_due_date", "class_id", "due_date"),)
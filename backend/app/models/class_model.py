@@ -1,13 +1,15 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
-from app.db.base_class import Base
+from app.db.base_class import Base, Timestamped
 
-class Class(Base):
+class Class(Timestamped, Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     teacher_id = Column(Integer, ForeignKey("user.id"), nullable=True)
     image_url = Column(String, nullable=True)
     class_code = Column(String, unique=True, index=True, nullable=False)
+    # Sequence number of the class's latest QAEvent
+    qa_seq = Column(Integer, nullable=False, default=0, server_default="0")
     
     teacher = relationship("User", backref="classes_taught")
     students = relationship("User", secondary="student_class", backref="classes_enrolled")
@@ -1,9 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
-from app.db.base_class import Base
+from app.db.base_class import Base, Timestamped
 
-class Message(Base):
+class Message(Timestamped, Base):
     id = Column(Integer, primary_key=True, index=True)
     sender_id = Column(Integer, ForeignKey("user.id"), nullable=False)
     receiver_id = Column(Integer, ForeignKey("user.id"), nullable=False)
@@ -13,3 +13,9 @@ class Message(Base):
 
     sender = relationship("User", foreign_keys=[sender_id])
     receiver = relationship("User", foreign_keys=[receiver_id])
+
+    # Both directions of a conversation, for chat history and presence peers
+    __table_args__ = (
+        Index("ix_message_sender_id_receiver_id", "sender_id", "receiver_id"),
+        Index("ix_message_receiver_id_sender_id", "receiver_id", "sender_id"),
+    )
@@ -1,9 +1,9 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import JSON, Column, Integer, String, ForeignKey, DateTime, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
-from app.db.base_class import Base
+from app.db.base_class import Base, Timestamped
 from datetime import datetime
 
-class Question(Base):
+class Question(Timestamped, Base):
     id = Column(Integer, primary_key=True, index=True)
     content = Column(Text, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
@@ -14,7 +14,7 @@ class Question(Base):
     class_ = relationship("Class", backref="questions")
     answers = relationship("Answer", back_populates="question", cascade="all, delete-orphan")
 
-class Answer(Base):
+class Answer(Timestamped, Base):
     id = Column(Integer, primary_key=True, index=True)
     content = Column(Text, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
@@ -23,3 +23,21 @@ class Answer(Base):
     
     teacher = relationship("User", backref="answers")
     question = relationship("Question", back_populates="answers")
+
+class QAEvent(Base):
+    """
+    A class's Q&A changes, numbered 1, 2, 3... per class (Class.qa_seq holds
+    the last number), so clients can fetch everything after the last one
+    they applied. Ids are not foreign keys: events outlive what they describe.
+    """
+    id = Column(Integer, primary_key=True)
+    class_id = Column(Integer, ForeignKey("class.id", ondelete="CASCADE"), nullable=False)
+    seq = Column(Integer, nullable=False)
+    type = Column(String, nullable=False)
+    question_id = Column(Integer, nullable=True)
+    answer_id = Column(Integer, nullable=True)
+    # Snapshot of the question or answer after the change; None for deletes
+    data = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (UniqueConstraint("class_id", "seq", name="uq_qaevent_class_id_seq"),)
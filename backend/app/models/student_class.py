@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, ForeignKey, Table
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, ForeignKey, Table
 from app.db.base_class import Base
 
 student_class = Table(
@@ -6,4 +7,6 @@ student_class = Table(
     Base.metadata,
     Column("student_id", Integer, ForeignKey("user.id"), primary_key=True),
     Column("class_id", Integer, ForeignKey("class.id"), primary_key=True),
+    # When the student joined; NULL for enrollments older than the column
+    Column("enrolled_at", DateTime, nullable=True, default=datetime.utcnow),
 )
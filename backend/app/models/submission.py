@@ -1,9 +1,9 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Float, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Float, JSON, Index
 from sqlalchemy.orm import relationship
-from app.db.base_class import Base
+from app.db.base_class import Base, Timestamped
 from datetime import datetime
 
-class Submission(Base):
+class Submission(Timestamped, Base):
     id = Column(Integer, primary_key=True, index=True)
     assignment_id = Column(Integer, ForeignKey("assignment.id"), nullable=False)
     student_id = Column(Integer, ForeignKey("user.id"), nullable=False)
@@ -15,3 +15,5 @@ class Submission(Base):
 
     assignment = relationship("Assignment", backref="submissions")
     student = relationship("User", backref="submissions")
+
+    __table_args__ = (Index("ix_submission_assignment_id_student_id", "assignment_id", "student_id"),)
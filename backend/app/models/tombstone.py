@@ -0,0 +1,68 @@
+from datetime import datetime
+from typing import Any, List
+from sqlalchemy import Column, DateTime, Integer, String, event, inspect
+from sqlalchemy.orm import Session
+from app.db.base_class import Base
+from app.db.session import SessionLocal
+
+class Tombstone(Base):
+    """
+    A synced row someone can no longer see, usually because it was deleted,
+    so delta sync can tell their clients to drop it. Addressed to one user
+    (user_id) or to a class's members (class_id). Written automatically by
+    the flush listener below, and pruned after SYNC_TOMBSTONE_RETENTION_DAYS
+    (see app.sync).
+    """
+    id = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    class_id = Column(Integer, nullable=True)
+    user_id = Column(Integer, nullable=True)
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+def _old_value(obj: Any, attr: str) -> Any:
+    history = inspect(obj).attrs[attr].history
+    if history.deleted and history.deleted[0] is not None and history.deleted[0] != getattr(obj, attr):
+        return history.deleted[0]
+    return None
+
+
+# Only the application's sessions: other sessions (scripts, tests binding
+# their own engine) don't pay for a scan of every flush
+@event.listens_for(SessionLocal, "before_flush")
+def _record_tombstones(session: Session, flush_context: Any, instances: Any) -> None:
+    if not session.deleted and not session.dirty:
+        return
+    # Imported here: the models package imports this module
+    from .assignment import Assignment
+    from .class_model import Class
+    from .student_class import student_class
+    from .submission import Submission
+
+    # Queries below don't autoflush: the session is already flushing
+    stones: List[Tombstone] = []
+    for obj in session.deleted:
+        if isinstance(obj, Class):
+            # Membership goes with the class, so address each member
+            members = {student_id for (student_id,) in session.query(student_class.c.student_id).filter(
+                student_class.c.class_id == obj.id
+            )}
+            members.add(obj.teacher_id)
+            stones += [Tombstone(entity="class", entity_id=obj.id, user_id=m) for m in members if m is not None]
+        elif isinstance(obj, Assignment):
+            stones.append(Tombstone(entity="assignment", entity_id=obj.id, class_id=obj.class_id))
+        elif isinstance(obj, Submission):
+            class_id = session.query(Assignment.class_id).filter(Assignment.id == obj.assignment_id).scalar()
+            stones.append(Tombstone(entity="submission", entity_id=obj.id, class_id=class_id, user_id=obj.student_id))
+    for obj in session.dirty:
+        # Moves take a row out of sight of its previous audience
+        if isinstance(obj, Class):
+            old_teacher = _old_value(obj, "teacher_id")
+            if old_teacher is not None:
+                stones.append(Tombstone(entity="class", entity_id=obj.id, user_id=old_teacher))
+        elif isinstance(obj, Assignment):
+            old_class = _old_value(obj, "class_id")
+            if old_class is not None:
+                stones.append(Tombstone(entity="assignment", entity_id=obj.id, class_id=old_class))
+    session.add_all(stones)
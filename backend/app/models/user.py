@@ -1,6 +1,6 @@
-from sqlalchemy import Boolean, Column, Integer, String, Enum
+from sqlalchemy import Boolean, Column, Index, Integer, String, Enum, func
 from sqlalchemy.orm import relationship
-from app.db.base_class import Base
+from app.db.base_class import Base, Timestamped
 import enum
 
 class UserRole(str, enum.Enum):
@@ -8,14 +8,17 @@ class UserRole(str, enum.Enum):
     STUDENT = "student"
     ADMIN = "admin"
 
-class User(Base):
+class User(Timestamped, Base):
     id = Column(Integer, primary_key=True, index=True)
     full_name = Column(String, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     avatar_url = Column(String, nullable=True)
     hashed_password = Column(String, nullable=False)
-    is_active = Column(Boolean(), default=True)
-    role = Column(Enum(UserRole), default=UserRole.STUDENT)
+    is_active: Column[bool] = Column(Boolean(), default=True)
+    role: Column[UserRole] = Column(Enum(UserRole), default=UserRole.STUDENT)
+
+    # Addresses differing only in case belong to the same person
+    __table_args__ = (Index("ix_user_email_lower", func.lower(email), unique=True),)
     
     # Relationships can be added here later
     # classes_taught = relationship("Class", back_populates="teacher")
@@ -0,0 +1,59 @@
+"""
+One-shot container preparation: wait for the database, apply migrations and
+seed the demo data if it is missing. Run before starting the API servers
+(``entrypoint.sh migrate``), not on every server boot.
+"""
+import logging
+import time
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+
+from app import initial_data
+from app.db.session import SessionLocal, engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 60
+RETRY_INTERVAL = 1.0
+
+
+def wait_for_db() -> None:
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return
+        except Exception as e:
+            if attempt == MAX_ATTEMPTS:
+                raise
+            logger.info("Waiting for database (%d/%d): %s", attempt, MAX_ATTEMPTS, e.__class__.__name__)
+            time.sleep(RETRY_INTERVAL)
+
+
+def run_migrations() -> None:
+    command.upgrade(Config("alembic.ini"), "head")
+
+
+def seed() -> None:
+    db = SessionLocal()
+    try:
+        if initial_data.is_seeded(db):
+            logger.info("Initial data already present, skipping seed")
+            return
+        initial_data.init_db(db)
+        logger.info("Initial data created")
+    finally:
+        db.close()
+
+
+def main() -> None:
+    wait_for_db()
+    run_migrations()
+    seed()
+
+
+if __name__ == "__main__":
+    main()
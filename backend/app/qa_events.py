@@ -0,0 +1,89 @@
+"""
+The per-class Q&A event log. Every change to a class's questions or answers
+is written with the next number of the class's sequence, in the same
+transaction as the change itself:
+
+    seq = qa_events.next_seq(db, class_id)   # locks the class row
+    ... insert / update / delete, flush ...
+    qa_events.record(db, class_id, seq, qa_events.QUESTION_CREATED,
+                     question_id=question.id, data=qa_events.snapshot(question))
+    db.commit()
+
+Taking the number first orders concurrent writers to a class, so numbers
+are committed without gaps and in order. The numbers double as the event
+ids of the class's SSE stream, which resumes from this log.
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+
+QUESTION_CREATED = "question_created"
+QUESTION_UPDATED = "question_updated"
+QUESTION_DELETED = "question_deleted"
+ANSWER_CREATED = "answer_created"
+ANSWER_UPDATED = "answer_updated"
+ANSWER_DELETED = "answer_deleted"
+
+# Creations are published under their original socket event names
+LIVE_TYPES = {QUESTION_CREATED: "new_question", ANSWER_CREATED: "new_answer"}
+
+
+def next_seq(db: Session, class_id: int) -> Optional[int]:
+    """Claim the class's next sequence number; None if there is no such class."""
+    return db.execute(
+        update(models.Class)
+        .where(models.Class.id == class_id)
+        # Q&A activity is not a change to the class itself, for delta sync
+        .values(qa_seq=models.Class.qa_seq + 1, updated_at=models.Class.updated_at)
+        .returning(models.Class.qa_seq)
+    ).scalar_one_or_none()
+
+
+def snapshot(question: Optional[models.Question] = None, answer: Optional[models.Answer] = None) -> Dict[str, Any]:
+    if answer is not None:
+        return schemas.AnswerSummary.model_validate(answer).model_dump(mode="json")
+    return schemas.QuestionSummary.model_validate(question).model_dump(mode="json")
+
+
+def record(
+    db: Session,
+    class_id: Any,
+    seq: int,
+    type: str,
+    *,
+    question_id: Any = None,
+    answer_id: Any = None,
+    data: Optional[Dict[str, Any]] = None,
+) -> None:
+    db.add(models.QAEvent(
+        class_id=class_id, seq=seq, type=type, question_id=question_id, answer_id=answer_id, data=data
+    ))
+
+
+def since(db: Session, class_id: int, after: int, limit: int) -> List[models.QAEvent]:
+    """Up to ``limit`` of the class's events after sequence ``after``, oldest first."""
+    # One range scan of the (class_id, seq) unique index
+    return db.query(models.QAEvent).filter(
+        models.QAEvent.class_id == class_id,
+        models.QAEvent.seq > after,  # type: ignore[arg-type]
+    ).order_by(models.QAEvent.seq).limit(limit).all()
+
+
+def compact_message(event: models.QAEvent) -> Dict[str, Any]:
+    """The compact socket event ``event`` was published as."""
+    message: Dict[str, Any] = {"seq": event.seq, "type": LIVE_TYPES.get(str(event.type), str(event.type))}
+    if event.data is not None:
+        message["data"] = event.data
+    else:
+        message["question_id"] = event.question_id
+        if event.answer_id is not None:
+            message["answer_id"] = event.answer_id
+    return message
+
+
+def replay(db: Session, class_id: int, after: int, limit: int) -> List[Dict[str, Any]]:
+    """The class's events after ``after`` as they were published, to resume a stream."""
+    return [compact_message(event) for event in since(db, class_id, after, limit)]
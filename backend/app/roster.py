@@ -0,0 +1,204 @@
+"""
+Bulk roster import: create or update users and enroll students in classes
+from a CSV or JSON Lines file.
+
+Columns / keys: email, full_name, role (student|teacher|admin, default
+student), password (optional, falls back to the import's default password)
+and class_codes (codes separated by ";" or spaces, students only).
+
+Rows are processed in batches: each batch is validated, its passwords are
+hashed in worker processes, then users and enrollments are written with one
+multi-row upsert each and committed. A bad row is reported and skipped
+without failing the rest of the import.
+
+An existing user keeps their name when the row leaves it empty, and always
+keeps their role: a row naming a different role is reported, not applied.
+Emails are matched without regard to case, like the unique index on
+lower(email); an existing user keeps the spelling already stored.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core.security import hash_passwords
+
+BATCH_SIZE = 1000
+
+
+def read_rows(stream: IO[bytes], filename: str) -> Iterator[Tuple[int, Any]]:
+    """Yield (line number, raw row) without reading the whole file into memory."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if filename.lower().endswith((".jsonl", ".ndjson")):
+        for line_no, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError:
+                yield line_no, None
+    else:
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, {key.strip(): value for key, value in row.items() if key and value not in (None, "")}
+
+
+def _insert(db: Session) -> Callable[..., Any]:
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise RuntimeError(f"Roster import does not support {dialect}")
+
+
+def _upsert_users(db: Session, rows: List[Dict[str, Any]], with_password: bool) -> None:
+    if not rows:
+        return
+    insert = _insert(db)
+    table = models.User.__table__
+    stmt = insert(table).values(rows)
+    # Role is never changed here; ON CONFLICT DO UPDATE doesn't apply
+    # column onupdate defaults
+    update = {
+        "full_name": func.coalesce(stmt.excluded.full_name, table.c.full_name),
+        "updated_at": datetime.utcnow(),
+    }
+    if with_password:
+        update["hashed_password"] = stmt.excluded.hashed_password
+    db.execute(stmt.on_conflict_do_update(index_elements=["email"], set_=update))
+
+
+class RosterImport:
+    def __init__(self, db: Session, default_password: Optional[str]) -> None:
+        self.db = db
+        self.default_password = default_password
+        self.result = schemas.RosterImportResult()
+        self._hashes: Dict[str, str] = {}
+        self._class_ids: Dict[str, Optional[int]] = {}
+        self._seen: Set[str] = set()
+        # Students whose class lists changed, for cache invalidation
+        self.enrolled_students: Set[int] = set()
+
+    def run(self, rows: Iterable[Tuple[int, Any]]) -> schemas.RosterImportResult:
+        batch: List[Tuple[int, schemas.RosterRow]] = []
+        for line_no, raw in rows:
+            row = self._validate(line_no, raw)
+            if row is not None:
+                batch.append((line_no, row))
+            if len(batch) >= BATCH_SIZE:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+        return self.result
+
+    def _error(self, line_no: int, email: Optional[str], message: str) -> None:
+        self.result.errors.append(schemas.RosterError(row=line_no, email=email, error=message))
+
+    def _validate(self, line_no: int, raw: Any) -> Optional[schemas.RosterRow]:
+        email = raw.get("email") if isinstance(raw, dict) else None
+        try:
+            row = schemas.RosterRow.model_validate(raw)
+        except ValidationError as e:
+            self._error(line_no, email, "; ".join(
+                f"{'.'.join(map(str, err['loc']))}: {err['msg']}" if err["loc"] else err["msg"] for err in e.errors()
+            ))
+            return None
+        row.full_name = (row.full_name or "").strip() or None
+        if row.email.lower() in self._seen:
+            self._error(line_no, row.email, "Email bị trùng lặp trong tệp")
+            return None
+        if row.password is None and self.default_password is None:
+            self._error(line_no, row.email, "Thiếu mật khẩu")
+            return None
+        if row.class_codes and row.role != models.UserRole.STUDENT:
+            self._error(line_no, row.email, "Chỉ học sinh mới được ghi danh vào lớp học")
+            return None
+        self._seen.add(row.email.lower())
+        return row
+
+    def _hash(self, batch: List[Tuple[int, schemas.RosterRow]]) -> None:
+        # Each distinct password is hashed once per import, so a shared
+        # default password costs one bcrypt round instead of one per user
+        pending = list({self._password(row) for _, row in batch} - self._hashes.keys())
+        self._hashes.update(zip(pending, hash_passwords(pending)))
+
+    def _password(self, row: schemas.RosterRow) -> str:
+        password = row.password or self.default_password
+        # _validate rejects rows without one
+        assert password is not None
+        return password
+
+    def _resolve_classes(self, batch: List[Tuple[int, schemas.RosterRow]]) -> None:
+        codes = {code for _, row in batch for code in row.class_codes} - self._class_ids.keys()
+        if not codes:
+            return
+        found: Dict[str, int] = dict(
+            self.db.query(models.Class.class_code, models.Class.id).filter(models.Class.class_code.in_(codes))
+        )
+        for code in codes:
+            self._class_ids[code] = found.get(code)
+
+    def _write(self, batch: List[Tuple[int, schemas.RosterRow]]) -> None:
+        stored: Sequence[Tuple[str, models.UserRole]] = self.db.query(models.User.email, models.User.role).filter(
+            func.lower(models.User.email).in_([row.email.lower() for _, row in batch])
+        ).all()
+        # lower(email) -> (stored email, role)
+        existing = {email.lower(): (email, role) for email, role in stored}
+        kept = []
+        for line_no, row in batch:
+            if row.email.lower() in existing:
+                # The upsert then conflicts on the stored address
+                row.email, role = existing[row.email.lower()]
+                if "role" in row.model_fields_set and row.role != role:
+                    self._error(line_no, row.email, f"Tài khoản đã tồn tại với vai trò {role.value}")
+                    continue
+                if row.class_codes and role != models.UserRole.STUDENT:
+                    self._error(line_no, row.email, "Chỉ học sinh mới được ghi danh vào lớp học")
+                    continue
+            kept.append((line_no, row))
+        batch = kept
+        emails = [row.email for _, row in batch]
+        self._hash(batch)
+        self._resolve_classes(batch)
+
+        users: Dict[bool, List[Dict[str, Any]]] = {True: [], False: []}
+        for _, row in batch:
+            users[row.password is not None].append({
+                "email": row.email,
+                "full_name": row.full_name,
+                "role": row.role,
+                "hashed_password": self._hashes[self._password(row)],
+                "is_active": True,
+            })
+        # Existing users keep their password unless the row sets one
+        _upsert_users(self.db, users[True], with_password=True)
+        _upsert_users(self.db, users[False], with_password=False)
+
+        user_ids: Dict[str, int] = dict(self.db.query(models.User.email, models.User.id).filter(models.User.email.in_(emails)))
+        enrollments = []
+        for line_no, row in batch:
+            for code in row.class_codes:
+                class_id = self._class_ids[code]
+                if class_id is None:
+                    self._error(line_no, row.email, f"Không tìm thấy lớp học {code}")
+                else:
+                    enrollments.append({"student_id": user_ids[row.email], "class_id": class_id})
+        if enrollments:
+            insert = _insert(self.db)
+            result = self.db.execute(insert(models.student_class).values(enrollments).on_conflict_do_nothing())
+            self.result.enrolled += max(result.rowcount, 0)
+            self.enrolled_students.update(e["student_id"] for e in enrollments)
+        self.db.commit()
+
+        updated = sum(1 for email in emails if email.lower() in existing)
+        self.result.created += len(batch) - updated
+        self.result.updated += updated
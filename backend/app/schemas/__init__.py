@@ -1,7 +1,27 @@
 from .user import User, UserCreate, UserUpdate
 from .class_schema import ClassSchema, ClassCreate, ClassUpdate
-from .assignment import Assignment, AssignmentCreate, AssignmentUpdate
-from .qa import Question, QuestionCreate, Answer, AnswerCreate
+from .assignment import Assignment, AssignmentCreate, AssignmentUpdate, AssignmentFeedItem
+from .qa import (
+    Question, QuestionCreate, QuestionUpdate, QuestionSummary, Answer, AnswerCreate, AnswerUpdate, AnswerSummary,
+    QAEvent, QAChanges,
+)
 from .token import Token, TokenPayload
 from .message import Message, MessageCreate, MessageBase
-from .submission import Submission, SubmissionCreate, SubmissionUpdate
+from .presence import Presence
+from .submission import Submission, SubmissionCreate, SubmissionUpdate, GradeEntry
+from .roster import RosterRow, RosterError, RosterImportResult
+from .sync import Deleted, SyncChanges
+
+__all__ = [
+    "User", "UserCreate", "UserUpdate",
+    "ClassSchema", "ClassCreate", "ClassUpdate",
+    "Assignment", "AssignmentCreate", "AssignmentUpdate", "AssignmentFeedItem",
+    "Question", "QuestionCreate", "QuestionUpdate", "QuestionSummary",
+    "Answer", "AnswerCreate", "AnswerUpdate", "AnswerSummary", "QAEvent", "QAChanges",
+    "Token", "TokenPayload",
+    "Message", "MessageCreate", "MessageBase",
+    "Presence",
+    "Submission", "SubmissionCreate", "SubmissionUpdate", "GradeEntry",
+    "RosterRow", "RosterError", "RosterImportResult",
+    "Deleted", "SyncChanges",
+]
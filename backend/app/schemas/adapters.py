@@ -0,0 +1,21 @@
+from functools import lru_cache
+from typing import Any, Iterable, List, Type
+
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def list_adapter(schema: Type[BaseModel]) -> TypeAdapter[List[Any]]:
+    """One prebuilt validator/serializer per schema instead of one per call."""
+    return TypeAdapter(List[schema])  # type: ignore[valid-type]
+
+
+def validate_list(schema: Type[BaseModel], rows: Iterable[Any]) -> List[Any]:
+    """Validate ORM rows in a single pass through the Rust core."""
+    rows_out: List[Any] = list_adapter(schema).validate_python(list(rows), from_attributes=True)
+    return rows_out
+
+
+def dump_list_json(schema: Type[BaseModel], rows: Iterable[Any]) -> str:
+    """Validate and encode ORM rows for a cached list response."""
+    return list_adapter(schema).dump_json(validate_list(schema, rows)).decode()
@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel
+from typing import Literal, Optional
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 
 class AssignmentBase(BaseModel):
@@ -20,8 +20,14 @@ class AssignmentUpdate(BaseModel):
 class AssignmentInDBBase(AssignmentBase):
     id: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class Assignment(AssignmentInDBBase):
     pass
+
+# An assignment as listed to one student, with that student's submission
+class AssignmentFeedItem(Assignment):
+    submission_id: Optional[int] = None
+    submitted_at: Optional[datetime] = None
+    grade: Optional[float] = None
+    status: Literal["not_submitted", "submitted", "graded"]
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 class ClassBase(BaseModel):
     name: str
@@ -18,14 +18,12 @@ class TeacherInfo(BaseModel):
     full_name: str
     email: str
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ClassInDBBase(ClassBase):
     id: int
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ClassSchema(ClassInDBBase):
     teacher: Optional[TeacherInfo] = None
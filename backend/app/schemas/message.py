@@ -1,6 +1,6 @@
 from typing import Optional
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 class MessageBase(BaseModel):
     content: str
@@ -15,5 +15,4 @@ class Message(MessageBase):
     timestamp: datetime
     is_read: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,8 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+class Presence(BaseModel):
+    user_id: int
+    online: bool
+    last_seen: Optional[datetime] = None
@@ -1,5 +1,5 @@
-from typing import Optional, List
-from pydantic import BaseModel
+from typing import Any, Dict, Optional, List
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 from .user import User
 
@@ -10,17 +10,27 @@ class AnswerBase(BaseModel):
 class AnswerCreate(AnswerBase):
     pass
 
+class AnswerUpdate(BaseModel):
+    content: str
+
 class AnswerInDBBase(AnswerBase):
     id: int
     timestamp: datetime
     teacher: Optional[User] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class Answer(AnswerInDBBase):
     pass
 
+class AnswerSummary(AnswerBase):
+    """An answer referencing its teacher by id, for compact socket events."""
+    id: int
+    timestamp: datetime
+    teacher_id: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
 class QuestionBase(BaseModel):
     content: str
     class_id: int
@@ -28,14 +38,40 @@ class QuestionBase(BaseModel):
 class QuestionCreate(QuestionBase):
     pass
 
+class QuestionUpdate(BaseModel):
+    content: str
+
 class QuestionInDBBase(QuestionBase):
     id: int
     timestamp: datetime
     student: Optional[User] = None
     answers: List[Answer] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class Question(QuestionInDBBase):
     pass
+
+class QuestionSummary(QuestionBase):
+    """A question referencing its student by id, for compact socket events."""
+    id: int
+    timestamp: datetime
+    student_id: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class QAEvent(BaseModel):
+    seq: int
+    type: str
+    question_id: Optional[int] = None
+    answer_id: Optional[int] = None
+    data: Optional[Dict[str, Any]] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class QAChanges(BaseModel):
+    """A class's events after ``since``; apply them in order, then ask again from ``last_seq``."""
+    events: List[QAEvent]
+    last_seq: int
+    has_more: bool
@@ -0,0 +1,31 @@
+from typing import Any, List, Optional
+from pydantic import BaseModel, EmailStr, field_validator
+from app.models.user import UserRole
+
+# One line of a roster file
+class RosterRow(BaseModel):
+    email: EmailStr
+    full_name: Optional[str] = None
+    role: UserRole = UserRole.STUDENT
+    password: Optional[str] = None
+    # Codes of the classes to enroll a student in
+    class_codes: List[str] = []
+
+    @field_validator("class_codes", mode="before")
+    @classmethod
+    def split_codes(cls, value: Any) -> List[str]:
+        # CSV cells hold several codes separated by ";" or spaces
+        if isinstance(value, str):
+            value = value.replace(";", " ").split()
+        return list(dict.fromkeys(value or []))
+
+class RosterError(BaseModel):
+    row: int
+    email: Optional[str] = None
+    error: str
+
+class RosterImportResult(BaseModel):
+    created: int = 0
+    updated: int = 0
+    enrolled: int = 0
+    errors: List[RosterError] = []
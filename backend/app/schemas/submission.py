@@ -1,6 +1,6 @@
 from typing import Optional, List
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 # Shared properties
 class SubmissionBase(BaseModel):
@@ -16,6 +16,12 @@ class SubmissionUpdate(SubmissionBase):
     grade: Optional[float] = None
     feedback: Optional[str] = None
 
+# One entry of a bulk grading request; omitted fields are left unchanged
+class GradeEntry(BaseModel):
+    submission_id: int
+    grade: Optional[float] = None
+    feedback: Optional[str] = None
+
 class SubmissionInDBBase(SubmissionBase):
     id: int
     assignment_id: int
@@ -24,8 +30,7 @@ class SubmissionInDBBase(SubmissionBase):
     grade: Optional[float] = None
     feedback: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 from app.schemas.user import User
 
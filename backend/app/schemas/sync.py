@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict
+from .assignment import Assignment
+from .class_schema import ClassSchema
+from .submission import Submission
+from .user import User
+
+class Deleted(BaseModel):
+    entity: str
+    entity_id: int
+    deleted_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class SyncChanges(BaseModel):
+    """
+    What changed for the user after the ``since`` they sent. Changed rows
+    replace local copies; deleted ones, and the assignments of a deleted
+    class, are dropped. Pass ``watermark`` as the next ``since``.
+
+    With ``full_resync`` the ``since`` was too old for its deletions to be
+    known: everything visible is sent, and the client must drop its local
+    copy and replace it with this response.
+    """
+    watermark: datetime
+    full_resync: bool = False
+    user: Optional[User] = None
+    classes: List[ClassSchema] = []
+    assignments: List[Assignment] = []
+    submissions: List[Submission] = []
+    deleted: List[Deleted] = []
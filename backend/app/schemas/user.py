@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from app.models.user import UserRole
 
 class UserBase(BaseModel):
@@ -22,9 +22,11 @@ class UserUpdate(BaseModel):
 
 class UserInDBBase(UserBase):
     id: int
+    # Stored emails were validated on the way in; re-running the email
+    # validator for every row dominated the cost of serializing user lists
+    email: str
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class User(UserInDBBase):
     pass
@@ -0,0 +1,62 @@
+"""
+Full-text search over Q&A and chat messages, and fuzzy typeahead over the
+user and class directories.
+
+On Postgres the question, answer and message tables carry a generated
+``search_vector`` column: the unaccented content under the 'simple'
+configuration, GIN-indexed. Vietnamese has no stemmer, and unaccenting
+both sides lets "bai tap" find "bài tập". Other databases (SQLite for
+local runs and benchmarks) fall back to a case-insensitive LIKE with a
+constant rank.
+"""
+from typing import Any, Sequence, Tuple
+
+from sqlalchemy import Float, Table, cast, func, literal, literal_column, or_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+SEARCH_CONFIG = "simple"
+
+
+def escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def match(db: Session, table: Table, text: str) -> Tuple[ColumnElement[Any], ColumnElement[Any]]:
+    """
+    Condition selecting rows of ``table`` whose content matches ``text``,
+    and their relevance as a float (higher is better).
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        query = func.websearch_to_tsquery(SEARCH_CONFIG, func.f_unaccent(text))
+        vector = literal_column(f"{table.name}.search_vector", type_=TSVECTOR)
+        # ts_rank_cd is a float4; widen it so cursor values round-trip exactly
+        return vector.op("@@")(query), cast(func.ts_rank_cd(vector, query), Float(precision=53))
+    return table.c.content.ilike(f"%{escape_like(text)}%", escape="\\"), literal(0.0, Float)
+
+
+def _normalized(value: ColumnElement[Any]) -> ColumnElement[Any]:
+    # Must stay identical to the expressions of the trigram indexes
+    return func.f_unaccent(func.lower(value))
+
+
+def fuzzy(db: Session, columns: Sequence[ColumnElement[Any]], text: str) -> Tuple[ColumnElement[Any], ColumnElement[Any]]:
+    """
+    Typeahead match of ``text`` against any of ``columns``: a substring, or
+    a typo-tolerant trigram match against some word. Returns the condition
+    and a similarity score in [0, 1].
+
+    On Postgres both tests are served by the pg_trgm GIN indexes.
+    """
+    pattern = f"%{escape_like(text)}%"
+    if db.get_bind().dialect.name == "postgresql":
+        needle = _normalized(literal(text))
+        fields = [_normalized(column) for column in columns]
+        condition = or_(
+            *(field.like(_normalized(literal(pattern)), escape="\\") for field in fields),
+            *(needle.op("<%")(field) for field in fields),
+        )
+        score = func.greatest(*(func.word_similarity(needle, field) for field in fields))
+        return condition, cast(score, Float(precision=53))
+    return or_(*(column.ilike(pattern, escape="\\") for column in columns)), literal(0.0, Float)
@@ -0,0 +1,356 @@
+"""
+Bulk data generator for staging, load testing and local development.
+
+    python -m app.seed --preset medium
+    python -m app.seed --schools 10 --students-per-school 5000 --messages 1000000
+
+Rows are streamed to Postgres with COPY (multi-row INSERTs on other
+databases) and every generated user shares one precomputed password hash.
+"""
+import argparse
+import csv
+import enum
+import io
+import json
+import logging
+import random
+from dataclasses import dataclass, fields, replace
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import Table, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.security import get_password_hash
+from app.db.session import SessionLocal
+from app.models.user import UserRole
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_PASSWORD = "seed123"
+EMAIL_DOMAIN = "seed.schoolconnect.vn"
+BATCH_SIZE = 10_000
+
+
+@dataclass(frozen=True)
+class Volumes:
+    schools: int
+    teachers_per_school: int
+    classes_per_school: int
+    students_per_school: int
+    classes_per_student: int
+    assignments_per_class: int
+    submission_ratio: float
+    questions_per_class: int
+    messages: int
+    # Messages between the first student and the first teacher, so there is
+    # always one long conversation to page through
+    hot_conversation: int
+
+    @property
+    def teachers(self) -> int:
+        return self.schools * self.teachers_per_school
+
+    @property
+    def classes(self) -> int:
+        return self.schools * self.classes_per_school
+
+    @property
+    def students(self) -> int:
+        return self.schools * self.students_per_school
+
+
+PRESETS: Dict[str, Volumes] = {
+    "small": Volumes(
+        schools=2, teachers_per_school=10, classes_per_school=50, students_per_school=1_000,
+        classes_per_student=4, assignments_per_class=5, submission_ratio=0.5,
+        questions_per_class=10, messages=50_000, hot_conversation=500,
+    ),
+    "medium": Volumes(
+        schools=10, teachers_per_school=10, classes_per_school=100, students_per_school=2_000,
+        classes_per_student=5, assignments_per_class=8, submission_ratio=0.5,
+        questions_per_class=20, messages=500_000, hot_conversation=2_000,
+    ),
+    "large": Volumes(
+        schools=50, teachers_per_school=10, classes_per_school=100, students_per_school=2_000,
+        classes_per_student=5, assignments_per_class=10, submission_ratio=0.4,
+        questions_per_class=20, messages=2_000_000, hot_conversation=5_000,
+    ),
+}
+
+
+def teacher_email(n: int) -> str:
+    return f"teacher{n}@{EMAIL_DOMAIN}"
+
+
+def student_email(n: int) -> str:
+    return f"student{n}@{EMAIL_DOMAIN}"
+
+
+def is_seeded(db: Session) -> bool:
+    return db.query(models.User.id).filter(models.User.email == teacher_email(0)).first() is not None
+
+
+def _next_id(db: Session, table: Table) -> int:
+    return (db.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+
+def _copy_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        # SQLAlchemy's Enum type persists member names
+        return value.name
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+def _copy_batch(db: Session, table: Table, columns: List[str], batch: List[Dict[str, Any]]) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in batch:
+        writer.writerow([_copy_value(row[column]) for column in columns])
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    sql = f'COPY "{table.name}" ({column_list}) FROM STDIN WITH (FORMAT csv)'
+
+    cursor = db.connection().connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+        else:
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def bulk_insert(db: Session, table: Table, rows: Iterable[Dict[str, Any]]) -> int:
+    """Stream rows into ``table`` in batches, using COPY on Postgres."""
+    use_copy = db.get_bind().dialect.name == "postgresql"
+    columns: Optional[List[str]] = None
+    total = 0
+    batch: List[Dict[str, Any]] = []
+
+    def flush() -> None:
+        if use_copy:
+            _copy_batch(db, table, columns or [], batch)
+        else:
+            # executemany is rewritten into multi-row INSERT ... VALUES batches
+            db.execute(insert(table), batch)
+
+    # COPY skips Python-side defaults; updated_at is NOT NULL
+    stamp = datetime.utcnow() if "updated_at" in table.c else None
+    for row in rows:
+        if stamp is not None and "updated_at" not in row:
+            row = {**row, "updated_at": stamp}
+        if columns is None:
+            columns = list(row)
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            flush()
+            total += len(batch)
+            batch = []
+    if batch:
+        flush()
+        total += len(batch)
+    logger.info("Inserted %d rows into %s", total, table.name)
+    return total
+
+
+def _sync_sequences(db: Session) -> None:
+    """Explicit ids bypass the serial sequences, so move them past the data."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for table in ("user", "class", "assignment", "submission", "message", "question", "answer"):
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM \"{table}\"))"
+        ))
+
+
+def generate(db: Session, volumes: Volumes, password: str = DEFAULT_PASSWORD, rng_seed: int = 42) -> None:
+    """
+    Generate a deterministic dataset. Students only enrol in classes of their
+    own school. Ids are allocated after the current maximum of each table, so
+    the data can be added to a database that already holds the demo rows.
+    """
+    rng = random.Random(rng_seed)
+    now = datetime.utcnow()
+    hashed_password = get_password_hash(password)
+
+    user_table = models.User.__table__
+    class_table = models.Class.__table__
+    assignment_table = models.Assignment.__table__
+    submission_table = models.Submission.__table__
+    message_table = models.Message.__table__
+    question_table = models.Question.__table__
+    answer_table = models.Answer.__table__
+
+    first_user = _next_id(db, user_table)
+    teacher_ids = [first_user + n for n in range(volumes.teachers)]
+    student_ids = [first_user + volumes.teachers + n for n in range(volumes.students)]
+
+    def users() -> Iterator[Dict[str, Any]]:
+        for n, user_id in enumerate(teacher_ids):
+            yield {
+                "id": user_id, "email": teacher_email(n), "full_name": f"Giao Vien {n}",
+                "hashed_password": hashed_password, "role": UserRole.TEACHER, "is_active": True,
+            }
+        for n, user_id in enumerate(student_ids):
+            yield {
+                "id": user_id, "email": student_email(n), "full_name": f"Hoc Sinh {n}",
+                "hashed_password": hashed_password, "role": UserRole.STUDENT, "is_active": True,
+            }
+
+    bulk_insert(db, user_table, users())
+
+    first_class = _next_id(db, class_table)
+    class_ids = [first_class + n for n in range(volumes.classes)]
+    class_teacher: Dict[int, int] = {}
+    for n, class_id in enumerate(class_ids):
+        school = n // volumes.classes_per_school
+        class_teacher[class_id] = teacher_ids[school * volumes.teachers_per_school + n % volumes.teachers_per_school]
+    bulk_insert(db, class_table, (
+        {
+            "id": class_id, "name": f"Truong {n // volumes.classes_per_school} - Lop {n % volumes.classes_per_school}",
+            "teacher_id": class_teacher[class_id], "image_url": None,
+            "class_code": f"S{class_id:05X}",
+        }
+        for n, class_id in enumerate(class_ids)
+    ))
+
+    # The first student is always enrolled in the first class
+    enrollments: Dict[int, List[int]] = {}
+    class_students: Dict[int, List[int]] = {class_id: [] for class_id in class_ids}
+    for n, student_id in enumerate(student_ids):
+        school = n // volumes.students_per_school
+        school_classes = class_ids[school * volumes.classes_per_school:(school + 1) * volumes.classes_per_school]
+        picked = rng.sample(school_classes, min(volumes.classes_per_student, len(school_classes)))
+        if n == 0 and class_ids[0] not in picked:
+            picked[0] = class_ids[0]
+        enrollments[student_id] = picked
+        for class_id in picked:
+            class_students[class_id].append(student_id)
+    bulk_insert(db, models.student_class, (
+        {"student_id": student_id, "class_id": class_id}
+        for student_id, picked in enrollments.items()
+        for class_id in picked
+    ))
+
+    first_assignment = _next_id(db, assignment_table)
+    class_assignments: Dict[int, List[int]] = {}
+
+    def assignments() -> Iterator[Dict[str, Any]]:
+        for n, class_id in enumerate(class_ids):
+            class_assignments[class_id] = []
+            for a in range(volumes.assignments_per_class):
+                assignment_id = first_assignment + n * volumes.assignments_per_class + a
+                class_assignments[class_id].append(assignment_id)
+                yield {
+                    "id": assignment_id, "title": f"Bai tap {a + 1}", "description": "Bai tap tu sinh",
+                    "due_date": now + timedelta(days=rng.randint(-30, 30)), "class_id": class_id,
+                }
+
+    bulk_insert(db, assignment_table, assignments())
+
+    first_submission = _next_id(db, submission_table)
+
+    def submissions() -> Iterator[Dict[str, Any]]:
+        submission_id = first_submission
+        for student_id, picked in enrollments.items():
+            for class_id in picked:
+                for assignment_id in class_assignments[class_id]:
+                    if rng.random() >= volumes.submission_ratio:
+                        continue
+                    graded = rng.random() < 0.5
+                    yield {
+                        "id": submission_id, "assignment_id": assignment_id, "student_id": student_id,
+                        "content": "Bai lam", "file_urls": [],
+                        "submitted_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+                        "grade": round(rng.uniform(0, 10), 1) if graded else None,
+                        "feedback": "Tot" if graded else None,
+                    }
+                    submission_id += 1
+
+    bulk_insert(db, submission_table, submissions())
+
+    first_message = _next_id(db, message_table)
+
+    def messages() -> Iterator[Dict[str, Any]]:
+        hot_pair = (student_ids[0], teacher_ids[0])
+        for n in range(volumes.messages):
+            if n < volumes.hot_conversation:
+                sender, receiver = hot_pair if n % 2 == 0 else hot_pair[::-1]
+            else:
+                student_id = rng.choice(student_ids)
+                teacher_id = class_teacher[rng.choice(enrollments[student_id])]
+                sender, receiver = (student_id, teacher_id) if rng.random() < 0.5 else (teacher_id, student_id)
+            yield {
+                "id": first_message + n, "sender_id": sender, "receiver_id": receiver,
+                "content": f"Tin nhan {n}", "timestamp": now - timedelta(seconds=volumes.messages - n),
+                "is_read": True,
+            }
+
+    bulk_insert(db, message_table, messages())
+
+    first_question = _next_id(db, question_table)
+    first_answer = _next_id(db, answer_table)
+    question_rows: List[Dict[str, Any]] = []
+    answer_rows: List[Dict[str, Any]] = []
+    for n, class_id in enumerate(class_ids):
+        students = class_students[class_id] or student_ids[:1]
+        for q in range(volumes.questions_per_class):
+            question_id = first_question + n * volumes.questions_per_class + q
+            asked_at = now - timedelta(hours=q)
+            question_rows.append({
+                "id": question_id, "content": f"Cau hoi {q}", "timestamp": asked_at,
+                "student_id": rng.choice(students), "class_id": class_id,
+            })
+            answer_rows.append({
+                "id": first_answer + len(answer_rows), "content": f"Tra loi {q}",
+                "timestamp": asked_at + timedelta(minutes=5),
+                "teacher_id": class_teacher[class_id], "question_id": question_id,
+            })
+    bulk_insert(db, question_table, question_rows)
+    bulk_insert(db, answer_table, answer_rows)
+
+    _sync_sequences(db)
+    db.commit()
+
+
+def parse_volumes(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.seed", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="password shared by all generated users")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    for field in fields(Volumes):
+        parser.add_argument(f"--{field.name.replace('_', '-')}", type=field.type, help=f"override the preset's {field.name}")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_volumes(argv)
+    overrides = {f.name: getattr(args, f.name) for f in fields(Volumes) if getattr(args, f.name) is not None}
+    volumes = replace(PRESETS[args.preset], **overrides)
+
+    db = SessionLocal()
+    try:
+        if is_seeded(db):
+            logger.info("Seed data already present, skipping")
+            return
+        logger.info("Generating %s", volumes)
+        generate(db, volumes, password=args.password, rng_seed=args.seed)
+        logger.info("Seed data created")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Delta sync: everything visible to a user that changed after a watermark,
+from the indexed ``updated_at`` of each row and the tombstones of deleted
+ones. On a quiet day every query is an empty index range.
+
+Rows can also become visible without changing, when a student joins a class
+or a class is handed to a teacher. Those classes are sent whole, with their
+assignments (and, for teachers, submissions), whatever their timestamps.
+
+Tombstones are kept for SYNC_TOMBSTONE_RETENTION_DAYS. A ``since`` older
+than that may have missed deletions, so it is answered with everything
+visible and ``full_resync`` set rather than with a delta.
+"""
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Set
+
+from sqlalchemy import and_, or_, select, true
+from sqlalchemy.orm import Session, joinedload
+
+from app import models
+from app.core.config import settings
+
+# Pruning is a single indexed delete; at most once an hour per worker
+PRUNE_INTERVAL_SECONDS = 3600
+_last_prune: Optional[float] = None
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def retention_start() -> datetime:
+    """The oldest ``since`` whose deletions are all still known."""
+    return datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+
+def prune_tombstones(db: Session) -> int:
+    """Delete tombstones past the retention window; returns how many."""
+    pruned = db.query(models.Tombstone).filter(
+        models.Tombstone.deleted_at < retention_start()  # type: ignore[arg-type]
+    ).delete(synchronize_session=False)
+    db.commit()
+    return pruned
+
+
+def maybe_prune_tombstones(db: Session) -> None:
+    global _last_prune
+    now = time.monotonic()
+    if _last_prune is None or now - _last_prune >= PRUNE_INTERVAL_SECONDS:
+        _last_prune = now
+        prune_tombstones(db)
+
+
+def changes(db: Session, user: models.User, since: Optional[datetime]) -> Dict[str, Any]:
+    """Rows changed after ``since`` (everything if None), for schemas.SyncChanges."""
+    full_resync = False
+    if since is not None:
+        since = _naive_utc(since)
+        if since < retention_start():
+            # Tombstones from before the window may be gone
+            since = None
+            full_resync = True
+    # Taken before reading, and trailing the clock: a row stamped before this
+    # but committed after the reads below is sent again next time, not lost
+    watermark = datetime.utcnow() - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+    if since is not None:
+        watermark = max(watermark, since)
+
+    def changed(column: Any) -> Any:
+        return true() if since is None else column > since
+
+    class_query = db.query(models.Class).options(joinedload(models.Class.teacher))
+    assignment_query = db.query(models.Assignment)
+    submission_query = db.query(models.Submission).options(joinedload(models.Submission.student))
+    tombstone_query = db.query(models.Tombstone).filter(changed(models.Tombstone.deleted_at))
+
+    if user.role == models.UserRole.ADMIN:
+        classes = class_query.filter(changed(models.Class.updated_at)).all()
+        assignments = assignment_query.filter(changed(models.Assignment.updated_at)).all()
+        submissions = submission_query.filter(changed(models.Submission.updated_at)).all()
+    elif user.role == models.UserRole.TEACHER:
+        taught: Set[int] = set(db.scalars(select(models.Class.id).where(models.Class.teacher_id == user.id)))
+        classes = class_query.filter(models.Class.id.in_(taught), changed(models.Class.updated_at)).all()
+        # A class changes rarely, and may have just been handed over: resend its contents
+        fresh = {class_obj.id for class_obj in classes}
+        assignments = assignment_query.filter(
+            models.Assignment.class_id.in_(taught),
+            or_(changed(models.Assignment.updated_at), models.Assignment.class_id.in_(fresh)),
+        ).all()
+        submissions = submission_query.join(
+            models.Assignment, models.Assignment.id == models.Submission.assignment_id
+        ).filter(
+            models.Assignment.class_id.in_(taught),
+            or_(changed(models.Submission.updated_at), models.Assignment.class_id.in_(fresh)),
+        ).all()
+        tombstone_query = tombstone_query.filter(or_(
+            models.Tombstone.user_id == user.id, models.Tombstone.class_id.in_(taught)
+        ))
+    else:
+        enrolled: Set[int] = set()
+        fresh = set()
+        for class_id, enrolled_at in db.query(
+            models.student_class.c.class_id, models.student_class.c.enrolled_at
+        ).filter(models.student_class.c.student_id == user.id):
+            enrolled.add(class_id)
+            if since is None or (enrolled_at is not None and enrolled_at > since):
+                fresh.add(class_id)
+        classes = class_query.filter(
+            models.Class.id.in_(enrolled), or_(changed(models.Class.updated_at), models.Class.id.in_(fresh))
+        ).all()
+        assignments = assignment_query.filter(
+            models.Assignment.class_id.in_(enrolled),
+            or_(changed(models.Assignment.updated_at), models.Assignment.class_id.in_(fresh)),
+        ).all()
+        submissions = submission_query.filter(
+            models.Submission.student_id == user.id, changed(models.Submission.updated_at)
+        ).all()
+        # Other students' submissions are addressed to them, not the class
+        tombstone_query = tombstone_query.filter(or_(
+            models.Tombstone.user_id == user.id,
+            and_(models.Tombstone.class_id.in_(enrolled), models.Tombstone.entity == "assignment"),
+        ))
+
+    deleted = []
+    if since is not None:
+        # A row sent as changed is visible again, e.g. moved back
+        sent = {
+            "class": {row.id for row in classes},
+            "assignment": {row.id for row in assignments},
+            "submission": {row.id for row in submissions},
+        }
+        deleted = [
+            stone for stone in tombstone_query.order_by(models.Tombstone.deleted_at)
+            if stone.entity_id not in sent.get(str(stone.entity), ())
+        ]
+
+    return {
+        "watermark": watermark,
+        "full_resync": full_resync,
+        "user": user if since is None or user.updated_at > since else None,
+        "classes": classes,
+        "assignments": assignments,
+        "submissions": submissions,
+        "deleted": deleted,
+    }
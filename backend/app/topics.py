@@ -0,0 +1,62 @@
+"""
+Real-time topics: who may subscribe to what, and the events published on
+them. Topic names are built by ``class_topic``/``user_topic`` in
+app.core.socket_manager.
+"""
+import re
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+
+_CLASS_TOPIC = re.compile(r"^class:(\d+):qa$")
+_USER_TOPIC = re.compile(r"^user:(\d+)$")
+
+
+def can_subscribe(db: Session, user_id: int, role: models.UserRole, topic: str) -> bool:
+    """
+    A user's own topic is theirs alone; a class's Q&A is open to its
+    teacher, its students and admins. Unknown topics are refused.
+    """
+    match = _USER_TOPIC.match(topic)
+    if match:
+        return int(match.group(1)) == user_id
+    match = _CLASS_TOPIC.match(topic)
+    if not match:
+        return False
+    if role == models.UserRole.ADMIN:
+        return True
+    class_id = int(match.group(1))
+    teacher_id = db.query(models.Class.teacher_id).filter(models.Class.id == class_id).scalar()
+    if teacher_id is None:
+        return False
+    if teacher_id == user_id:
+        return True
+    return db.query(models.student_class).filter(
+        models.student_class.c.class_id == class_id, models.student_class.c.student_id == user_id
+    ).first() is not None
+
+
+def store_message(db: Session, sender_id: int, data: Any) -> Optional[Dict[str, Any]]:
+    """
+    Save a direct message sent over a socket and return the event announcing
+    it, or None if ``data`` is not a message.
+    """
+    try:
+        message_in = schemas.MessageCreate.model_validate(data)
+    except ValueError:
+        return None
+    if not message_in.content:
+        return None
+    message = models.Message(sender_id=sender_id, receiver_id=message_in.receiver_id, content=message_in.content)
+    db.add(message)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Unknown receiver
+        db.rollback()
+        return None
+    db.refresh(message)
+    return {"type": "new_message", "message": schemas.Message.model_validate(message).model_dump()}
@@ -0,0 +1,107 @@
+import asyncio
+import socket
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import uvicorn
+
+
+@dataclass
+class Result:
+    scenario: str
+    requests: int
+    concurrency: int
+    errors: int
+    elapsed: float
+    latencies: List[float] = field(repr=False)
+
+    def percentile(self, pct: float) -> float:
+        """Nearest-rank percentile of the successful latencies, in ms."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+        return ordered[rank] * 1000
+
+    @property
+    def throughput(self) -> float:
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        data = asdict(self)
+        del data["latencies"]
+        data.update(
+            p50_ms=round(self.percentile(50), 2),
+            p95_ms=round(self.percentile(95), 2),
+            p99_ms=round(self.percentile(99), 2),
+            throughput_rps=round(self.throughput, 1),
+        )
+        return data
+
+
+Operation = Callable[[int], Awaitable[None]]
+
+
+async def run(scenario: str, operation: Operation, requests: int, concurrency: int) -> Result:
+    """Run ``operation`` ``requests`` times with at most ``concurrency`` in flight."""
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal next_index, errors
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                await operation(index)
+            except Exception:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return Result(scenario, requests, concurrency, errors, time.perf_counter() - started, latencies)
+
+
+def format_table(results: List[Result]) -> str:
+    header = f"{'scenario':<16}{'reqs':>8}{'conc':>6}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.scenario:<16}{r.requests:>8}{r.concurrency:>6}{r.errors:>8}"
+            f"{r.percentile(50):>10.2f}{r.percentile(95):>10.2f}{r.percentile(99):>10.2f}{r.throughput:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+class BackgroundServer:
+    """Serves main:app with uvicorn on a free local port from a daemon thread."""
+
+    def __init__(self, app: str = "main:app") -> None:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "BackgroundServer":
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.server.should_exit = True
+        if self.thread is not None:
+            self.thread.join(timeout=10)
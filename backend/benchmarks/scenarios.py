@@ -0,0 +1,176 @@
+"""
+Benchmark scenarios. Each scenario prepares its state over the public API
+and returns the operation to time plus an optional cleanup coroutine.
+"""
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import websockets
+
+from app import seed
+from benchmarks.runner import Operation
+
+API = "/api/v1"
+PASSWORD = "benchmark"
+
+Cleanup = Optional[Callable[[], Awaitable[None]]]
+
+
+class Context:
+    def __init__(self, client: httpx.AsyncClient, users: int, subscribers: int, upload_kb: int) -> None:
+        self.client = client
+        self.users = users
+        self.subscribers = subscribers
+        self.upload_kb = upload_kb
+        self._headers: Dict[str, Dict[str, str]] = {}
+
+    async def login(self, email: str) -> Dict[str, str]:
+        if email not in self._headers:
+            response = await self.client.post(
+                f"{API}/login/access-token", data={"username": email, "password": PASSWORD}
+            )
+            response.raise_for_status()
+            self._headers[email] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return self._headers[email]
+
+    async def student_headers(self) -> List[Dict[str, str]]:
+        return [await self.login(seed.student_email(n)) for n in range(self.users)]
+
+    @property
+    def ws_url(self) -> str:
+        return str(self.client.base_url).replace("http", "ws", 1)
+
+
+def _check(response: httpx.Response) -> None:
+    if response.status_code >= 400:
+        raise RuntimeError(f"{response.request.url} -> {response.status_code}")
+
+
+async def login(ctx: Context) -> Tuple[Operation, Cleanup]:
+    async def operation(i: int) -> None:
+        response = await ctx.client.post(
+            f"{API}/login/access-token",
+            data={"username": seed.student_email(i % ctx.users), "password": PASSWORD},
+        )
+        _check(response)
+
+    return operation, None
+
+
+async def dashboard(ctx: Context) -> Tuple[Operation, Cleanup]:
+    """The requests the student dashboard issues on load."""
+    headers = await ctx.student_headers()
+    paths = ["/users/me", "/classes/", "/assignments/", "/grades/me", "/progress/me"]
+
+    async def operation(i: int) -> None:
+        responses = await asyncio.gather(
+            *(ctx.client.get(API + path, headers=headers[i % len(headers)]) for path in paths)
+        )
+        for response in responses:
+            _check(response)
+
+    return operation, None
+
+
+async def chat_history(ctx: Context) -> Tuple[Operation, Cleanup]:
+    """Page through the seeded hot conversation between student 0 and teacher 0."""
+    headers = await ctx.login(seed.student_email(0))
+    teacher_headers = await ctx.login(seed.teacher_email(0))
+    me = await ctx.client.get(f"{API}/users/me", headers=teacher_headers)
+    _check(me)
+    peer_id = me.json()["id"]
+
+    async def operation(i: int) -> None:
+        response = await ctx.client.get(
+            f"{API}/chat/{peer_id}/messages", params={"skip": (i * 100) % 1000, "limit": 100}, headers=headers
+        )
+        _check(response)
+
+    return operation, None
+
+
+async def qa_broadcast(ctx: Context) -> Tuple[Operation, Cleanup]:
+    """
+    Time from posting a question until every subscriber of the class
+    Q&A socket has received the broadcast.
+    """
+    headers = await ctx.login(seed.student_email(0))
+    classes = await ctx.client.get(f"{API}/classes/", headers=headers)
+    _check(classes)
+    class_id = classes.json()[0]["id"]
+
+    pending: Dict[str, Tuple[int, asyncio.Event]] = {}
+    token = headers["Authorization"].split(" ", 1)[1]
+    sockets = []
+    for _ in range(ctx.subscribers):
+        ws = await websockets.connect(f"{ctx.ws_url}{API}/ws?token={token}")
+        await ws.send(json.dumps({"action": "subscribe", "topic": f"class:{class_id}:qa"}))
+        if json.loads(await ws.recv()).get("type") != "subscribed":
+            raise RuntimeError(f"Could not subscribe to class {class_id}")
+        sockets.append(ws)
+
+    async def listen(ws: Any) -> None:
+        async for raw in ws:
+            message = json.loads(raw)
+            marker = message.get("data", {}).get("content")
+            if marker in pending:
+                remaining, done = pending[marker]
+                pending[marker] = (remaining - 1, done)
+                if remaining == 1:
+                    done.set()
+
+    listeners = [asyncio.create_task(listen(ws)) for ws in sockets]
+
+    async def operation(i: int) -> None:
+        marker = f"benchmark question {i}"
+        done = asyncio.Event()
+        pending[marker] = (len(sockets), done)
+        try:
+            response = await ctx.client.post(
+                f"{API}/qa/", json={"content": marker, "class_id": class_id}, headers=headers
+            )
+            _check(response)
+            await asyncio.wait_for(done.wait(), timeout=10)
+        finally:
+            pending.pop(marker, None)
+
+    async def cleanup() -> None:
+        for task in listeners:
+            task.cancel()
+        for ws in sockets:
+            await ws.close()
+
+    return operation, cleanup
+
+
+async def upload(ctx: Context) -> Tuple[Operation, Cleanup]:
+    headers = await ctx.student_headers()
+    payload = b"x" * (ctx.upload_kb * 1024)
+    uploaded: List[Tuple[str, Dict[str, str]]] = []
+
+    async def operation(i: int) -> None:
+        user_headers = headers[i % len(headers)]
+        response = await ctx.client.post(
+            f"{API}/submissions/upload",
+            files={"file": (f"bench_{i}.bin", payload, "application/octet-stream")},
+            headers=user_headers,
+        )
+        _check(response)
+        uploaded.append((response.json()["url"], user_headers))
+
+    async def cleanup() -> None:
+        for url, user_headers in uploaded:
+            await ctx.client.delete(f"{API}/submissions/files", params={"file_url": url}, headers=user_headers)
+
+    return operation, cleanup
+
+
+SCENARIOS: Dict[str, Callable[[Context], Awaitable[Tuple[Operation, Cleanup]]]] = {
+    "login": login,
+    "dashboard": dashboard,
+    "chat_history": chat_history,
+    "qa_broadcast": qa_broadcast,
+    "upload": upload,
+}
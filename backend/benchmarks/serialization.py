@@ -0,0 +1,158 @@
+"""
+Compare JSON encoding strategies on list endpoint payloads and on the
+WebSocket broadcast path.
+
+    python -m benchmarks.serialization [--rows 100] [--iterations 300]
+
+Each HTTP variant serves the same pages built from transient ORM objects
+(no database involved), so the numbers isolate validation + encoding cost.
+"response_model default" is FastAPI's own path when no response class is
+configured; on recent FastAPI it serializes through Pydantic's Rust core.
+"""
+import argparse
+import json
+import time
+import warnings
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from pydantic import TypeAdapter
+
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app import models, schemas
+from app.core.responses import FastJSONResponse, dumps
+from app.schemas.adapters import dump_list_json
+
+
+def build_rows(count: int) -> Dict[str, List[Any]]:
+    now = datetime.utcnow()
+    users = [
+        models.User(id=n, email=f"student{n}@school.com", full_name=f"Hoc Sinh {n}",
+                    role=models.UserRole.STUDENT, is_active=True, avatar_url=f"/static/avatars/{n}.png")
+        for n in range(count)
+    ]
+    submissions = [
+        models.Submission(id=n, assignment_id=1, student_id=n, student=users[n], content="Bai lam " * 20,
+                          file_urls=[f"/static/submissions/{n}_bai.pdf"], submitted_at=now - timedelta(minutes=n),
+                          grade=8.5, feedback="Tot")
+        for n in range(count)
+    ]
+    messages = [
+        models.Message(id=n, sender_id=1, receiver_id=2, content="Tin nhan " * 10,
+                       timestamp=now - timedelta(seconds=n), is_read=True)
+        for n in range(count)
+    ]
+    return {"users": users, "submissions": submissions, "messages": messages}
+
+
+def build_app(rows: Dict[str, List[Any]], response_class: Any = None) -> FastAPI:
+    kwargs = {"default_response_class": response_class} if response_class else {}
+    app = FastAPI(**kwargs)
+
+    @app.get("/users", response_model=List[schemas.User])
+    def users() -> Any:
+        return rows["users"]
+
+    @app.get("/submissions", response_model=List[schemas.Submission])
+    def submissions() -> Any:
+        return rows["submissions"]
+
+    @app.get("/messages", response_model=List[schemas.Message])
+    def messages() -> Any:
+        return rows["messages"]
+
+    @app.get("/messages-untyped")
+    def messages_untyped() -> Any:
+        # Endpoints without a response model go through jsonable_encoder
+        return [schemas.Message.model_validate(m).model_dump() for m in rows["messages"]]
+
+    return app
+
+
+def measure(call: Callable[[], Any], iterations: int) -> float:
+    for _ in range(10):
+        call()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call()
+    return (time.perf_counter() - started) / iterations * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=300)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows)
+    variants = {
+        "JSONResponse": JSONResponse,
+        "FastJSONResponse": FastJSONResponse,
+        "response_model default": None,
+    }
+    print(f"{'variant':<24}" + "".join(f"{path:>20}" for path in ("/users", "/submissions", "/messages", "/messages-untyped")))
+    for name, response_class in variants.items():
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            client = TestClient(build_app(rows, response_class))
+        timings = [
+            measure(lambda: client.get(path), args.iterations)
+            for path in ("/users", "/submissions", "/messages", "/messages-untyped")
+        ]
+        print(f"{name:<24}" + "".join(f"{ms:>17.2f} ms" for ms in timings))
+
+    # Encoding alone, on already validated models
+    adapter = TypeAdapter(List[schemas.Submission])
+    validated = adapter.validate_python(rows["submissions"], from_attributes=True)
+    encoders = {
+        "jsonable_encoder + json": lambda: json.dumps(jsonable_encoder(validated)).encode(),
+        "dump_python + orjson": lambda: dumps(adapter.dump_python(validated)),
+        "dump_json (pydantic)": lambda: adapter.dump_json(validated),
+    }
+    print()
+    for name, encode in encoders.items():
+        print(f"encode {args.rows} submissions, {name:<26}{measure(encode, args.iterations):>8.3f} ms")
+
+    # Validation + encoding of ORM rows, as the cached list endpoints do it
+    row_strategies = {
+        "per-row from_orm().dict()": lambda: json.dumps(
+            [jsonable_encoder(schemas.Submission.from_orm(s).dict()) for s in rows["submissions"]]
+        ),
+        "per-row model_validate": lambda: json.dumps(
+            [schemas.Submission.model_validate(s).model_dump(mode="json") for s in rows["submissions"]]
+        ),
+        "cached TypeAdapter": lambda: dump_list_json(schemas.Submission, rows["submissions"]),
+    }
+    print()
+    for name, serialize in row_strategies.items():
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            print(f"serialize {args.rows} ORM submissions, {name:<26}{measure(serialize, args.iterations):>8.3f} ms")
+
+    # A Q&A broadcast to a class of 100 subscribers
+    question = schemas.Question.model_validate(
+        models.Question(id=1, content="Cau hoi " * 20, class_id=1, timestamp=datetime.utcnow(),
+                        student=rows["users"][0], answers=[])
+    ).model_dump()
+    subscribers = 100
+
+    def per_connection_json() -> None:
+        # What send_json does for every connection, after .isoformat() munging
+        for _ in range(subscribers):
+            json.dumps({"type": "new_question", "data": {**question, "timestamp": question["timestamp"].isoformat()}})
+
+    def encode_once() -> None:
+        dumps({"type": "new_question", "data": question}).decode()
+
+    print()
+    print(f"broadcast to {subscribers} sockets: send_json per connection "
+          f"{measure(per_connection_json, args.iterations):.3f} ms, "
+          f"orjson once {measure(encode_once, args.iterations):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+#!/bin/sh
+# Container entry point.
+#   migrate  wait for the database, apply migrations, seed demo data (one-shot)
+#   serve    production server: gunicorn with uvicorn workers, app preloaded
+#   dev      single auto-reloading uvicorn process
+set -e
+
+case "$1" in
+    migrate)
+        exec python -m app.prestart
+        ;;
+    serve)
+        exec gunicorn main:app -c gunicorn.conf.py
+        ;;
+    dev)
+        exec uvicorn main:app --host 0.0.0.0 --port 8000 --reload
+        ;;
+    *)
+        exec "$@"
+        ;;
+esac
@@ -0,0 +1,50 @@
+# Production server settings, used by `entrypoint.sh serve`.
+import os
+from typing import Any
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+# One worker by default. Socket and SSE subscribers, presence, the event
+# stream history and the "memory" cache and rate-limit backends all live in
+# the process: with more workers an event published in one never reaches
+# clients connected to another, cache invalidations don't cross workers and
+# every worker enforces the rate limits on its own. Raise WEB_CONCURRENCY
+# only behind sticky sessions and with CACHE_BACKEND=redis and
+# RATE_LIMIT_BACKEND=redis, and accept that real-time events stay per worker.
+workers = int(os.getenv("WEB_CONCURRENCY", 1))
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Import the app once in the master so workers fork ready to serve
+preload_app = True
+
+timeout = int(os.getenv("WORKER_TIMEOUT", 60))
+graceful_timeout = 20
+keepalive = 5
+accesslog = "-"
+
+
+def post_fork(server: Any, worker: Any) -> None:
+    # Connections opened while preloading must not be shared across processes
+    from app.db.session import engine
+
+    engine.dispose(close=False)
+
+
+def when_ready(server: Any) -> None:
+    workers = server.cfg.workers
+    if workers == 1:
+        return
+    from app.core.config import settings
+
+    per_process = [
+        name for name, backend in (
+            ("CACHE_BACKEND", settings.CACHE_BACKEND), ("RATE_LIMIT_BACKEND", settings.RATE_LIMIT_BACKEND)
+        ) if backend != "redis"
+    ]
+    if per_process:
+        server.log.warning(
+            "%d workers with per-process %s: cache invalidations and rate limits are not shared",
+            workers, ", ".join(per_process),
+        )
+    server.log.warning(
+        "%d workers: WebSocket and SSE events only reach clients of the worker that published them", workers
+    )
@@ -1,14 +1,73 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from app.api.api_v1.api import api_router
-from app.core.socket_manager import manager
+from app.core.admission import AdmissionController, AdmissionMiddleware, RouteGroup
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.profiling import ProfilingMiddleware, instrument_engine, metrics_registry
+from app.core.ratelimit import rate_limiter
+from app.core.security import shutdown_hash_pool
+from app.db.session import engine
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="SchoolConnect API")
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    yield
+    # Password hashing processes started by roster imports
+    shutdown_hash_pool()
+
+# No default_response_class on purpose: for routes with a response model
+# FastAPI encodes through Pydantic's Rust serializer, which measures as fast
+# as orjson (python -m benchmarks.serialization) and is disabled by a custom
+# default. FastJSONResponse (app.core.responses) is opt-in for other routes.
+app = FastAPI(title="SchoolConnect API", lifespan=lifespan)
+
+# Load shedding for deadline bursts: submissions and uploads are capped and
+# queue behind every other request, so teachers' pages stay responsive.
+# Exports and archives hold their slot for the whole download, so they are
+# kept out of the shared capacity under a cap of their own.
+admission = AdmissionController(
+    settings.ADMISSION_MAX_CONCURRENCY,
+    groups=[
+        # Long streaming downloads: their own small cap, no shared slot
+        RouteGroup(
+            "download",
+            patterns=(r"/api/v1/grades/classes/\d+/export", r"/api/v1/submissions/assignment/\d+/archive"),
+            methods={"GET"},
+            priority=2,
+            max_concurrency=settings.ADMISSION_DOWNLOAD_CONCURRENCY,
+            max_queue=settings.ADMISSION_MAX_QUEUE,
+            max_wait=settings.ADMISSION_DOWNLOAD_MAX_WAIT_SECONDS,
+            shared=False,
+        ),
+        RouteGroup(
+            "submit",
+            prefixes=("/api/v1/submissions", "/api/v1/files/upload", "/api/v1/upload"),
+            methods={"POST"},
+            priority=1,
+            max_concurrency=settings.ADMISSION_SUBMIT_CONCURRENCY,
+            max_queue=settings.ADMISSION_MAX_QUEUE,
+            max_wait=settings.ADMISSION_SUBMIT_MAX_WAIT_SECONDS,
+        ),
+    ],
+    default=RouteGroup(
+        "default",
+        max_queue=settings.ADMISSION_MAX_QUEUE,
+        max_wait=settings.ADMISSION_MAX_WAIT_SECONDS,
+    ),
+)
+if settings.ADMISSION_ENABLED:
+    # Added before CORS so shed responses still carry CORS headers
+    app.add_middleware(
+        AdmissionMiddleware, controller=admission, exempt=("/", "/metrics", r"/api/v1/qa/\d+/events")
+    )
 
 # CORS middleware
 app.add_middleware(
@@ -17,8 +76,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Next-Cursor", "Retry-After", "X-Event-Seq"],
 )
 
+# Per-request timing and SQL statement accounting
+instrument_engine(engine)
+app.add_middleware(ProfilingMiddleware)
+
 # Mount static files for images
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -26,19 +90,12 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 app.include_router(api_router, prefix="/api/v1")
 
 @app.get("/")
-def read_root():
+def read_root() -> Dict[str, Any]:
     return {"message": "Welcome to SchoolConnect API"}
 
-# WebSocket endpoint
-@app.websocket("/ws/{client_id}")
-async def websocket_endpoint(websocket, client_id: str):
-    await manager.connect(websocket, client_id)
-    try:
-        while True:
-            data = await websocket.receive_text()
-            # Echo back for now - actual logic in endpoints
-            await manager.send_personal_message(f"Message received: {data}", client_id)
-    except Exception as e:
-        logger.error(f"WebSocket error: {e}")
-    finally:
-        manager.disconnect(client_id)
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics() -> str:
+    """Per-route latency histograms in Prometheus text format"""
+    return metrics_registry.render() + (
+        response_cache.render_metrics() + rate_limiter.render_metrics() + admission.render_metrics()
+    )
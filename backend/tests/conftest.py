@@ -0,0 +1,101 @@
+"""
+The tests run the app against an in-memory SQLite database, swapped in
+before the app is imported, with fresh tables, caches and rate-limit
+buckets for every test. Run them from the backend directory.
+"""
+from typing import Callable, Dict, Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.db import session as db_session
+
+db_session.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+db_session.SessionLocal.configure(bind=db_session.engine)
+
+import main  # noqa: E402
+from app import models  # noqa: E402
+from app.core import cache, ratelimit, ws_auth  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token, get_password_hash  # noqa: E402
+from app.db.base_class import Base  # noqa: E402
+
+PASSWORD = "secret"
+# bcrypt is slow on purpose; every test user shares one hash
+PASSWORD_HASH = get_password_hash(PASSWORD)
+
+
+@pytest.fixture(autouse=True)
+def fresh_state() -> Iterator[None]:
+    Base.metadata.create_all(db_session.engine)
+    cache.response_cache.backend = cache.MemoryBackend(settings.CACHE_MAX_ENTRIES)
+    ratelimit.rate_limiter.backend = ratelimit.MemoryBackend(settings.RATE_LIMIT_MAX_KEYS)
+    ws_auth._cache = ws_auth._Cache(settings.WS_AUTH_CACHE_MAX_ENTRIES)
+    yield
+    Base.metadata.drop_all(db_session.engine)
+
+
+@pytest.fixture
+def db() -> Iterator[Session]:
+    session = db_session.SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def make_user(db: Session) -> Callable[..., models.User]:
+    def make(email: str, role: models.UserRole = models.UserRole.STUDENT, full_name: str = "") -> models.User:
+        user = models.User(
+            email=email, full_name=full_name or email, hashed_password=PASSWORD_HASH, role=role, is_active=True
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+    return make
+
+
+@pytest.fixture
+def teacher(make_user: Callable[..., models.User]) -> models.User:
+    return make_user("teacher@example.com", models.UserRole.TEACHER, "Cô Lan")
+
+
+@pytest.fixture
+def student(make_user: Callable[..., models.User]) -> models.User:
+    return make_user("student@example.com", models.UserRole.STUDENT, "Minh")
+
+
+@pytest.fixture
+def admin(make_user: Callable[..., models.User]) -> models.User:
+    return make_user("admin@example.com", models.UserRole.ADMIN, "Admin")
+
+
+def auth(user: models.User) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {create_access_token(user.id)}"}
+
+
+@pytest.fixture
+def headers() -> Callable[[models.User], Dict[str, str]]:
+    return auth
+
+
+@pytest.fixture
+def make_class(db: Session) -> Callable[..., models.Class]:
+    def make(name: str, teacher: models.User, code: str, *students: models.User) -> models.Class:
+        class_obj = models.Class(name=name, teacher_id=teacher.id, class_code=code)
+        db.add(class_obj)
+        db.commit()
+        for student in students:
+            db.execute(models.student_class.insert().values(class_id=class_obj.id, student_id=student.id))
+        db.commit()
+        db.refresh(class_obj)
+        return class_obj
+    return make
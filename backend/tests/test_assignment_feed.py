@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import pytest
+
+from app import models
+
+
+@pytest.fixture
+def assignments(db, teacher, student, make_class):
+    class_obj = make_class("Toán", teacher, "TOAN01", student)
+    due_dates = [datetime(2026, 10, 1), None, datetime(2026, 11, 1), None, datetime(2026, 10, 15)]
+    rows = [models.Assignment(title=f"Bài {i}", class_id=class_obj.id, due_date=due) for i, due in enumerate(due_dates)]
+    db.add_all(rows)
+    db.commit()
+    return {row.id: row.due_date for row in rows}
+
+
+def feed(client, headers, **params):
+    seen, cursor = [], None
+    while True:
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/assignments/feed", params={"limit": 2, **params}, headers=headers)
+        assert response.status_code == 200
+        seen += [row["id"] for row in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize("sort", ["due_date", "-due_date"])
+def test_undated_assignments_come_last(client, student, headers, assignments, sort):
+    ids = feed(client, headers(student), sort=sort)
+    dated = sorted((due, id) for id, due in assignments.items() if due is not None)
+    if sort.startswith("-"):
+        dated.reverse()
+    undated = sorted(id for id, due in assignments.items() if due is None)
+    if sort.startswith("-"):
+        undated.reverse()
+    assert ids == [id for _, id in dated] + undated
+
+
+def test_due_window_leaves_out_undated(client, student, headers, assignments):
+    after = feed(client, headers(student), due_after="2026-10-10T00:00:00")
+    before = feed(client, headers(student), due_before="2026-10-10T00:00:00")
+    assert sorted(after + before) == sorted(id for id, due in assignments.items() if due is not None)
@@ -0,0 +1,42 @@
+def class_names(client, headers):
+    response = client.get("/api/v1/classes/", headers=headers)
+    assert response.status_code == 200
+    return sorted(c["name"] for c in response.json())
+
+
+def test_teacher_list_follows_writes(client, teacher, admin, headers):
+    assert class_names(client, headers(teacher)) == []
+
+    created = client.post("/api/v1/classes/", json={"name": "Văn"}, headers=headers(teacher)).json()
+    assert class_names(client, headers(teacher)) == ["Văn"]
+
+    client.put(f"/api/v1/classes/{created['id']}", json={"name": "Văn 11"}, headers=headers(teacher))
+    assert class_names(client, headers(teacher)) == ["Văn 11"]
+
+    client.delete(f"/api/v1/classes/{created['id']}", headers=headers(admin))
+    assert class_names(client, headers(teacher)) == []
+
+
+def test_student_list_follows_join(client, teacher, student, headers, make_class):
+    class_obj = make_class("Lý", teacher, "LY1234")
+    assert class_names(client, headers(student)) == []
+
+    response = client.post("/api/v1/classes/join", params={"class_code": "LY1234"}, headers=headers(student))
+    assert response.status_code == 200
+    assert class_names(client, headers(student)) == ["Lý"]
+    assert client.get(f"/api/v1/classes/{class_obj.id}", headers=headers(student)).status_code == 200
+
+
+def test_teacher_rename_reaches_cached_classes(client, teacher, student, admin, headers, make_class):
+    class_obj = make_class("Hóa", teacher, "HOA123", student)
+    views = [
+        lambda: client.get("/api/v1/classes/", headers=headers(teacher)).json()[0],
+        lambda: client.get("/api/v1/classes/", headers=headers(student)).json()[0],
+        lambda: client.get("/api/v1/classes/", headers=headers(admin)).json()[0],
+        lambda: client.get(f"/api/v1/classes/{class_obj.id}", headers=headers(student)).json(),
+    ]
+    assert all(view()["teacher"]["full_name"] == "Cô Lan" for view in views)
+
+    response = client.put(f"/api/v1/users/{teacher.id}", json={"full_name": "Cô Lan Anh"}, headers=headers(teacher))
+    assert response.status_code == 200
+    assert all(view()["teacher"]["full_name"] == "Cô Lan Anh" for view in views)
@@ -0,0 +1,17 @@
+from app import models
+from app.core.security import create_access_token
+
+
+def test_legacy_chat_socket_stores_and_delivers(client, db, teacher, student):
+    teacher_url = f"/api/v1/chat/ws/{teacher.id}?token={create_access_token(teacher.id)}"
+    student_url = f"/api/v1/chat/ws/{student.id}?token={create_access_token(student.id)}"
+    # One event loop for both sockets
+    with client, client.websocket_connect(teacher_url) as teacher_socket:
+        with client.websocket_connect(student_url) as student_socket:
+            student_socket.send_json({"receiver_id": teacher.id, "content": "Em chào cô"})
+            event = teacher_socket.receive_json()
+            assert event["message"]["content"] == "Em chào cô"
+            assert event["message"]["sender_id"] == student.id
+
+    stored = db.query(models.Message).one()
+    assert (stored.sender_id, stored.receiver_id, stored.content) == (student.id, teacher.id, "Em chào cô")
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app import models
+from app.api.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    columns = [models.Class.updated_at, models.Class.name, models.Class.id]
+    values = [datetime(2024, 9, 5, 7, 30, 15, 123456), "Toán 10A", 42]
+    assert decode_cursor(encode_cursor(values), columns) == values
+
+
+def test_cursor_round_trip_keeps_null():
+    columns = [models.Class.updated_at, models.Class.id]
+    assert decode_cursor(encode_cursor([None, 7]), columns) == [None, 7]
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", encode_cursor([1, 2]), encode_cursor(["x"])[:-3]])
+def test_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, [models.Class.id])
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("sort", ["id", "-id", "name", "-name"])
+def test_class_list_pages_through_every_row(client, teacher, headers, make_class, sort):
+    for i in range(7):
+        # Repeated names so the id tiebreak is exercised
+        make_class(f"Lớp {i % 3}", teacher, f"CODE{i}")
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, "sort": sort}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/classes/", params=params, headers=headers(teacher))
+        assert response.status_code == 200
+        seen += [(c["name"], c["id"]) for c in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    key = (lambda c: c[1]) if sort.lstrip("-") == "id" else (lambda c: c)
+    assert len(seen) == 7
+    assert seen == sorted(seen, key=key, reverse=sort.startswith("-"))
+
+
+def test_class_list_rejects_bad_cursor(client, teacher, headers):
+    response = client.get("/api/v1/classes/", params={"cursor": "garbage"}, headers=headers(teacher))
+    assert response.status_code == 400
@@ -0,0 +1,47 @@
+import pytest
+
+from app import models
+from app.core.presence import conversation_peers, presence
+from app.core.security import create_access_token
+
+
+@pytest.fixture
+def chatted(db, teacher, student, admin):
+    # Messages both ways and repeated: one conversation all the same
+    for sender, receiver in [(student, teacher), (teacher, student), (student, teacher), (admin, student)]:
+        db.add(models.Message(sender_id=sender.id, receiver_id=receiver.id, content="chào"))
+    db.commit()
+
+
+def test_conversation_peers_are_unique(db, teacher, student, admin, chatted):
+    assert conversation_peers(db, [teacher.id]) == {(teacher.id, student.id)}
+    assert conversation_peers(db, [student.id]) == {(student.id, teacher.id), (student.id, admin.id)}
+    assert conversation_peers(db, [teacher.id, student.id]) == {
+        (teacher.id, student.id), (student.id, teacher.id), (student.id, admin.id)
+    }
+
+
+def test_presence_lookup_has_no_duplicates(client, teacher, student, headers):
+    response = client.get(
+        "/api/v1/chat/presence", params={"ids": [teacher.id, student.id, student.id]}, headers=headers(teacher)
+    )
+    assert response.status_code == 200
+    assert sorted(entry["user_id"] for entry in response.json()) == [teacher.id, student.id]
+
+
+def test_presence_events(client, monkeypatch, teacher, student, chatted):
+    monkeypatch.setattr(presence, "interval", 0.05)
+    teacher_token, student_token = create_access_token(teacher.id), create_access_token(student.id)
+    with client:
+        with client.websocket_connect(f"/api/v1/ws?token={teacher_token}") as teacher_socket:
+            with client.websocket_connect(f"/api/v1/ws?token={student_token}"):
+                # A second tab coming and going within the interval changes nothing
+                with client.websocket_connect(f"/api/v1/ws?token={student_token}"):
+                    pass
+                event = teacher_socket.receive_json()
+                assert event["type"] == "presence"
+                assert event["users"] == [{"user_id": student.id, "online": True, "last_seen": None}]
+
+            event = teacher_socket.receive_json()
+            assert [(u["user_id"], u["online"]) for u in event["users"]] == [(student.id, False)]
+            assert event["users"][0]["last_seen"] is not None
@@ -0,0 +1,49 @@
+def changes(client, headers, class_id, since, limit=500):
+    response = client.get(f"/api/v1/qa/{class_id}/changes", params={"since": since, "limit": limit}, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_changes_since_in_sequence(client, teacher, student, headers, make_class):
+    class_obj = make_class("Sử", teacher, "SU1234", student)
+    question = client.post(
+        "/api/v1/qa/", json={"content": "Câu hỏi", "class_id": class_obj.id}, headers=headers(student)
+    ).json()
+    answer = client.post(
+        "/api/v1/qa/answer", json={"content": "Trả lời", "question_id": question["id"]}, headers=headers(teacher)
+    ).json()
+    client.put(f"/api/v1/qa/answers/{answer['id']}", json={"content": "Sửa"}, headers=headers(teacher))
+    client.delete(f"/api/v1/qa/questions/{question['id']}", headers=headers(teacher))
+
+    everything = changes(client, headers(student), class_obj.id, 0)
+    seqs = [event["seq"] for event in everything["events"]]
+    assert seqs == list(range(1, len(seqs) + 1))
+    assert len(seqs) == 4
+    assert everything["last_seq"] == 4 and not everything["has_more"]
+
+    # Paging with since=last_seq replays the same events exactly once
+    paged, since = [], 0
+    while True:
+        page = changes(client, headers(student), class_obj.id, since, limit=3)
+        paged += page["events"]
+        since = page["last_seq"]
+        if not page["has_more"]:
+            break
+    assert paged == everything["events"]
+
+    caught_up = changes(client, headers(student), class_obj.id, 4)
+    assert caught_up["events"] == [] and caught_up["last_seq"] == 4
+
+
+def test_read_carries_event_seq(client, teacher, student, headers, make_class):
+    class_obj = make_class("Địa", teacher, "DIA123", student)
+    assert client.get(f"/api/v1/qa/{class_obj.id}").headers["X-Event-Seq"] == "0"
+    client.post("/api/v1/qa/", json={"content": "Hỏi", "class_id": class_obj.id}, headers=headers(student))
+    assert client.get(f"/api/v1/qa/{class_obj.id}").headers["X-Event-Seq"] == "1"
+
+
+def test_changes_need_membership(client, teacher, student, make_user, headers, make_class):
+    class_obj = make_class("GDCD", teacher, "GDCD12", student)
+    outsider = make_user("ngoai@example.com")
+    response = client.get(f"/api/v1/qa/{class_obj.id}/changes", headers=headers(outsider))
+    assert response.status_code == 403
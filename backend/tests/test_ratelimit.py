@@ -0,0 +1,39 @@
+import os
+
+from tests.conftest import PASSWORD
+
+
+def login(client, email, password):
+    return client.post("/api/v1/login/access-token", data={"username": email, "password": password})
+
+
+def test_login_is_limited_per_account(client, teacher, student):
+    statuses = [login(client, teacher.email, "wrong").status_code for _ in range(6)]
+    assert 429 not in statuses[:5]
+    assert statuses[5] == 429
+
+    limited = login(client, teacher.email, PASSWORD)
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+    # Another account from the same address still gets through
+    assert login(client, student.email, PASSWORD).status_code == 200
+
+
+def test_uploads_are_limited_per_user(client, student, teacher, headers):
+    responses = [
+        client.post("/api/v1/submissions/upload", files={"file": ("bai.txt", b"x")}, headers=headers(student))
+        for _ in range(11)
+    ]
+    try:
+        assert [r.status_code for r in responses[:10]] == [200] * 10
+        assert responses[10].status_code == 429
+        assert "Retry-After" in responses[10].headers
+        # Reads and other users are not affected
+        assert client.get("/api/v1/users/me", headers=headers(student)).status_code == 200
+        other = client.post("/api/v1/submissions/upload", files={"file": ("bai.txt", b"x")}, headers=headers(teacher))
+        assert other.status_code == 200
+        responses.append(other)
+    finally:
+        for response in responses:
+            if response.status_code == 200:
+                os.remove(response.json()["url"].lstrip("/"))
@@ -0,0 +1,76 @@
+from app import models
+
+
+def import_roster(client, headers, content, filename="roster.csv"):
+    return client.post(
+        "/api/v1/users/import",
+        files={"file": (filename, content)},
+        data={"default_password": "matkhau"},
+        headers=headers,
+    )
+
+
+def test_import_counts(client, db, admin, teacher, student, headers, make_class):
+    make_class("Sinh", teacher, "SINH01")
+    csv = (
+        "email,full_name,role,password,class_codes\n"
+        "moi@example.com,Học sinh mới,,,SINH01\n"
+        "student@example.com,Minh Anh,,,SINH01\n"
+        "teacher@example.com,,student,,\n"
+        "moi@example.com,Trùng,,,\n"
+        "khong-hop-le,,,,\n"
+    ).encode()
+    response = import_roster(client, headers(admin), csv)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["created"] == 1
+    assert result["updated"] == 1
+    assert result["enrolled"] == 2
+    assert sorted(error["row"] for error in result["errors"]) == [4, 5, 6]
+
+    db.expire_all()
+    users = {user.email: user for user in db.query(models.User)}
+    assert users["student@example.com"].full_name == "Minh Anh"
+    # An import never changes the role of an existing account
+    assert users["teacher@example.com"].role == models.UserRole.TEACHER
+    assert users["moi@example.com"].full_name == "Học sinh mới"
+
+
+def test_import_names_are_kept_when_blank(client, db, admin, student, headers):
+    response = import_roster(client, headers(admin), b"email,full_name\nstudent@example.com,\n")
+    assert response.json()["updated"] == 1
+    db.expire_all()
+    assert db.get(models.User, student.id).full_name == "Minh"
+
+
+def test_import_rejects_other_encodings(client, admin, headers):
+    csv = "email,full_name\nhs@example.com,Đặng\n".encode("utf-16")
+    response = import_roster(client, headers(admin), csv)
+    assert response.status_code == 400
+
+
+def test_import_is_admin_only(client, teacher, headers):
+    assert import_roster(client, headers(teacher), b"email\nx@example.com\n").status_code == 403
+
+
+def test_import_matches_emails_regardless_of_case(client, db, admin, teacher, headers, make_user, make_class):
+    existing = make_user("Alice@School.edu", full_name="Alice")
+    class_obj = make_class("Anh", teacher, "ANH123")
+    csv = "email,full_name,class_codes\nalice@school.edu,Alice Nguyen,ANH123\nALICE@school.EDU,Trùng,\n".encode()
+    result = import_roster(client, headers(admin), csv).json()
+    assert result["created"] == 0 and result["updated"] == 1 and result["enrolled"] == 1
+    assert [error["row"] for error in result["errors"]] == [3]
+
+    db.expire_all()
+    assert db.query(models.User).filter(models.User.email.ilike("alice@school.edu")).count() == 1
+    assert db.get(models.User, existing.id).email == "Alice@School.edu"
+    assert db.get(models.User, existing.id).full_name == "Alice Nguyen"
+    assert [c.id for c in db.get(models.User, existing.id).classes_enrolled] == [class_obj.id]
+
+
+def test_register_rejects_email_in_other_case(client, student):
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"email": "STUDENT@example.com", "password": "matkhau", "full_name": "Minh", "role": "student"},
+    )
+    assert response.status_code == 400
@@ -0,0 +1,95 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import models
+from app.core.config import settings
+from app.sync import prune_tombstones
+
+
+@pytest.fixture(autouse=True)
+def no_overlap(monkeypatch):
+    # Deltas contain exactly the rows written after the watermark
+    monkeypatch.setattr(settings, "SYNC_OVERLAP_SECONDS", 0)
+
+
+def sync(client, headers, since=None):
+    response = client.get("/api/v1/sync", params={"since": since} if since else {}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    # Give rows written next a later updated_at than this watermark
+    time.sleep(0.01)
+    return body
+
+
+def ids(body, entity):
+    return sorted(row["id"] for row in body[entity])
+
+
+def test_deltas(client, teacher, student, headers):
+    class_obj = client.post("/api/v1/classes/", json={"name": "Tin"}, headers=headers(teacher)).json()
+    assignment = client.post(
+        "/api/v1/assignments/", json={"title": "Bài 1", "class_id": class_obj["id"]}, headers=headers(teacher)
+    ).json()
+
+    full = sync(client, headers(student))
+    assert ids(full, "classes") == [] and full["user"]
+    idle = sync(client, headers(student), full["watermark"])
+    assert ids(idle, "classes") == [] and ids(idle, "assignments") == [] and not idle["user"]
+
+    client.post("/api/v1/classes/join", params={"class_code": class_obj["class_code"]}, headers=headers(student))
+    joined = sync(client, headers(student), idle["watermark"])
+    # Rows that were already there arrive with the enrollment that made them visible
+    assert ids(joined, "classes") == [class_obj["id"]]
+    assert ids(joined, "assignments") == [assignment["id"]]
+
+    teacher_state = sync(client, headers(teacher))
+    client.post("/api/v1/submissions/", json={"assignment_id": assignment["id"], "content": "Nộp"}, headers=headers(student))
+    submitted = sync(client, headers(teacher), teacher_state["watermark"])
+    assert len(submitted["submissions"]) == 1
+    assert ids(submitted, "classes") == [] and ids(submitted, "assignments") == []
+
+
+def test_tombstones(client, teacher, student, admin, headers, make_class):
+    class_obj = make_class("Nhạc", teacher, "NHAC01", student)
+    keep = client.post("/api/v1/assignments/", json={"title": "Giữ", "class_id": class_obj.id}, headers=headers(teacher)).json()
+    drop = client.post("/api/v1/assignments/", json={"title": "Xóa", "class_id": class_obj.id}, headers=headers(teacher)).json()
+    state = sync(client, headers(student))
+    assert ids(state, "assignments") == sorted([keep["id"], drop["id"]]) and state["deleted"] == []
+
+    client.delete(f"/api/v1/assignments/{drop['id']}", headers=headers(teacher))
+    after = sync(client, headers(student), state["watermark"])
+    assert [(d["entity"], d["entity_id"]) for d in after["deleted"]] == [("assignment", drop["id"])]
+    assert ids(after, "assignments") == []
+
+    client.delete(f"/api/v1/classes/{class_obj.id}", headers=headers(admin))
+    gone = sync(client, headers(student), after["watermark"])
+    assert ("class", class_obj.id) in [(d["entity"], d["entity_id"]) for d in gone["deleted"]]
+
+
+def test_since_older_than_retention_resyncs(client, db, teacher, student, headers, make_class):
+    make_class("Vẽ", teacher, "VE1234", student)
+    old = (datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 1)).isoformat()
+    body = sync(client, headers(student), old)
+    assert body["full_resync"]
+    assert len(body["classes"]) == 1 and body["user"]
+    assert not sync(client, headers(student), body["watermark"])["full_resync"]
+
+
+def test_prune_tombstones(db, teacher, make_class):
+    class_obj = make_class("Thể dục", teacher, "TD1234")
+    for title in ("A", "B"):
+        assignment = models.Assignment(title=title, class_id=class_obj.id)
+        db.add(assignment)
+        db.commit()
+        db.delete(assignment)
+        db.commit()
+    assert db.query(models.Tombstone).count() == 2
+
+    expired = datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 1)
+    oldest = db.query(models.Tombstone).order_by(models.Tombstone.id).first()
+    oldest.deleted_at = expired
+    db.commit()
+    assert prune_tombstones(db) == 1
+    assert db.query(models.Tombstone).count() == 1
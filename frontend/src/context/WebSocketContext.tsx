@@ -19,7 +19,10 @@ export const WebSocketProvider: React.FC<{ children: React.ReactNode }> = ({ chi
             socket.close();
         }
         // Use localhost for development, should be configured via env
-        const ws = new WebSocket(`ws://localhost:8000/api/v1/qa/ws/${classId}`);
+        const ws = new WebSocket(`ws://localhost:8000/api/v1/qa/ws/${classId}`, [
+            'bearer',
+            sessionStorage.getItem('access_token') || '',
+        ]);
 
         ws.onopen = () => {
             console.log('WebSocket Connected');
@@ -61,7 +61,10 @@ const Chat: React.FC = () => {
     useEffect(() => {
         if (!currentUser) return;
 
-        const ws = new WebSocket(`ws://localhost:8000/api/v1/chat/ws/${currentUser.id}`);
+        const ws = new WebSocket(`ws://localhost:8000/api/v1/chat/ws/${currentUser.id}`, [
+            'bearer',
+            sessionStorage.getItem('access_token') || '',
+        ]);
 
         ws.onopen = () => {
             console.log('Connected to Chat WebSocket');
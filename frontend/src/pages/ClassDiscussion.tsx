@@ -80,7 +80,8 @@ const ClassDiscussion: React.FC = () => {
         // Since axios baseURL is http://localhost:8000/api/v1, we can derive it or hardcode for now
         const wsUrl = `${protocol}//localhost:8000/api/v1/qa/ws/${classId}`;
 
-        ws.current = new WebSocket(wsUrl);
+        // The access token travels as a subprotocol; browsers cannot set headers on a WebSocket
+        ws.current = new WebSocket(wsUrl, ['bearer', sessionStorage.getItem('access_token') || '']);
 
         ws.current.onopen = () => {
             console.log('Connected to WebSocket');